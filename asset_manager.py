@@ -0,0 +1,109 @@
+import hashlib
+import os
+from typing import Dict, Tuple
+import pygame
+
+# Where pre-scaled sprites are kept between runs
+CACHE_DIR = ".cache/sprites"
+
+
+class AssetManager:
+    """
+    Loads sprites once, scales them, converts them to the display format and
+    packs them into a single atlas surface.
+
+    Scaled sprites are cached on disk under a name derived from the source
+    file's hash and the scale factor, so later startups skip the rescale and
+    an edited source image is picked up automatically.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR):
+        """
+        Initialize the asset manager.
+
+        Args:
+            cache_dir: Directory for the scaled sprite cache
+        """
+        self.cache_dir = cache_dir
+        self.atlas = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _cache_path(self, path: str, scale: float) -> str:
+        with open(path, "rb") as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}_{scale:g}x.png")
+
+    def load_scaled(self, path: str, scale: float) -> pygame.Surface:
+        """
+        Load a sprite scaled by the given factor, using the disk cache when possible.
+
+        Args:
+            path: Source image file
+            scale: Scale factor applied to both dimensions
+
+        Returns:
+            pygame.Surface: The scaled sprite, not yet converted to the display format
+        """
+        cache_path = self._cache_path(path, scale)
+        if os.path.exists(cache_path):
+            try:
+                image = pygame.image.load(cache_path)
+                self.cache_hits += 1
+                return image
+            except pygame.error as e:
+                print(f"Ignoring unreadable cached sprite {cache_path}: {e}")
+
+        self.cache_misses += 1
+        image = pygame.image.load(path)
+        image = pygame.transform.scale(image,
+            (int(image.get_width() * scale),
+             int(image.get_height() * scale)))
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            pygame.image.save(image, cache_path)
+        except (OSError, pygame.error) as e:
+            print(f"Failed to cache sprite {path}: {e}")
+        return image
+
+    def load_sprites(self, sprites: Dict[str, Tuple[str, float]]) -> Dict[str, pygame.Surface]:
+        """
+        Load a set of sprites and pack them into one atlas.
+
+        Args:
+            sprites: Sprite name -> (source image path, scale factor)
+
+        Returns:
+            dict: Sprite name -> surface. With a display open these are
+            subsurfaces of a display-format atlas, so blits take the fast path.
+        """
+        images = {name: self.load_scaled(path, scale) for name, (path, scale) in sprites.items()}
+        return self.pack_atlas(images)
+
+    def pack_atlas(self, images: Dict[str, pygame.Surface]) -> Dict[str, pygame.Surface]:
+        """
+        Pack loaded sprites into one atlas. Loading is safe on any thread, but
+        this converts to the display format and so belongs on the main thread.
+
+        Args:
+            images: Sprite name -> surface from load_scaled
+
+        Returns:
+            dict: Sprite name -> surface, as for load_sprites
+        """
+        if pygame.display.get_surface() is None:
+            # Conversion needs a display mode; headless callers only need sizes
+            return images
+
+        # Shelf packing: sprites side by side in a single row
+        width = sum(image.get_width() for image in images.values())
+        height = max(image.get_height() for image in images.values())
+        self.atlas = pygame.Surface((width, height), pygame.SRCALPHA)
+        rects = {}
+        x = 0
+        for name, image in images.items():
+            rects[name] = self.atlas.blit(image, (x, 0))
+            x += image.get_width()
+        self.atlas = self.atlas.convert_alpha()
+
+        return {name: self.atlas.subsurface(rect) for name, rect in rects.items()}
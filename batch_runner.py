@@ -0,0 +1,243 @@
+"""
+Runs many headless games in parallel for balancing and soak testing.
+
+Each game gets a bot, a seed and one combination of the swept parameters,
+and is played on a process pool with one worker per core. Score, survival
+time and per-step cost are written to a single results file:
+
+    python batch_runner.py --games 200 --param alien_speed=40,50,60 \\
+        --param shoot_chance=0.003,0.005 --output sweep.json
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, fields
+from typing import Dict, List, Tuple
+import numpy as np
+from constants import FIXED_TIMESTEP, PLAYER_SPEED, WINDOW_WIDTH
+from input_state import FrameInput, apply_input
+from simulation import Simulation, SimParams, load_sprite_sizes
+
+
+class RandomBot:
+    """Holds a random direction for a random while and fires at random"""
+
+    def __init__(self, seed: int):
+        self.random = random.Random(seed)
+        self.direction = 0
+        self.hold = 0
+
+    def __call__(self, sim: Simulation) -> FrameInput:
+        if self.hold <= 0:
+            self.direction = self.random.choice((-1, 0, 1))
+            self.hold = self.random.randint(10, 60)
+        self.hold -= 1
+        return FrameInput(left=self.direction < 0, right=self.direction > 0,
+                          fire=self.random.random() < 0.5)
+
+
+class DodgeBot:
+    """
+    Steps out from under the nearest projectile coming down on the player,
+    otherwise lines up under the closest alien, and fires constantly.
+    """
+
+    # Projectiles further above the player than this are ignored
+    LOOKAHEAD = 200
+
+    def __init__(self, seed: int):
+        # Deterministic, so the seed is unused; bots all take one
+        pass
+
+    def __call__(self, sim: Simulation) -> FrameInput:
+        player = sim.player
+        center = player.x + player.width / 2
+        projectiles = sim.alien_projectiles
+        threat = None
+        if len(projectiles):
+            dx = projectiles.center_x() - center
+            above = player.y - projectiles.y
+            near = (np.abs(dx) < player.width) & (above > 0) & (above < self.LOOKAHEAD)
+            if near.any():
+                threat = float(dx[near][np.argmin(above[near])])
+        if threat is not None:
+            # Move away from the projectile, unless a wall is in the way
+            direction = -1 if threat > 0 else 1
+            if (center < player.width and direction < 0
+                    or center > WINDOW_WIDTH - player.width and direction > 0):
+                direction = -direction
+        elif len(sim.aliens):
+            dx = sim.aliens.center_x() - center
+            target = float(dx[np.argmin(np.abs(dx))])
+            direction = 0 if abs(target) < PLAYER_SPEED * FIXED_TIMESTEP else (1 if target > 0 else -1)
+        else:
+            direction = 0
+        return FrameInput(left=direction < 0, right=direction > 0, fire=True)
+
+
+BOTS = {
+    "random": RandomBot,
+    "dodge": DodgeBot,
+}
+
+# Sprite sizes are read once per worker process rather than once per game
+_sprite_sizes = None
+
+
+def run_game(job: Tuple[int, Dict[str, float], str, int, float]) -> dict:
+    """
+    Play one game to the end, or until max_time seconds of game time.
+
+    Args:
+        job: (game index, parameter overrides, bot name, seed, max_time)
+
+    Returns:
+        dict: The game's parameters and results
+    """
+    global _sprite_sizes
+    index, overrides, bot_name, seed, max_time = job
+    if _sprite_sizes is None:
+        _sprite_sizes = load_sprite_sizes()
+
+    params = SimParams(**overrides)
+    sim = Simulation(seed=seed, sprite_sizes=_sprite_sizes, params=params)
+    bot = BOTS[bot_name](seed)
+    max_steps = int(max_time / FIXED_TIMESTEP)
+    step_ns = np.zeros(max_steps, dtype=np.int64)
+    steps = 0
+    while steps < max_steps and not sim.game_over:
+        started = time.perf_counter_ns()
+        apply_input(sim, bot(sim))
+        sim.step(FIXED_TIMESTEP)
+        sim.events.clear()
+        step_ns[steps] = time.perf_counter_ns() - started
+        steps += 1
+
+    step_us = step_ns[:steps] / 1000
+    return {
+        "game": index,
+        "seed": seed,
+        "bot": bot_name,
+        **asdict(params),
+        "score": sim.score,
+        "survival_time": sim.time,
+        "died": sim.game_over,
+        "steps": steps,
+        "step_us_mean": float(step_us.mean()) if steps else 0.0,
+        "step_us_p99": float(np.percentile(step_us, 99)) if steps else 0.0,
+        "step_us_max": float(step_us.max()) if steps else 0.0,
+    }
+
+
+def parse_sweep(specs: List[str]) -> List[Dict[str, float]]:
+    """
+    Expand --param name=v1,v2,... options into every combination of values.
+
+    Returns:
+        list: One dict of SimParams overrides per combination
+    """
+    names = {f.name for f in fields(SimParams)}
+    axes = []
+    for spec in specs:
+        name, _, values = spec.partition("=")
+        if name not in names:
+            raise SystemExit(f"Unknown parameter {name!r}; choose from {', '.join(sorted(names))}")
+        axes.append([(name, float(value)) for value in values.split(",")])
+    return [dict(combination) for combination in itertools.product(*axes)]
+
+
+def positive_int(text: str) -> int:
+    """argparse type for counts that must be at least one"""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def summarize(results: List[dict], sweep: List[Dict[str, float]]) -> List[dict]:
+    """Average each parameter set's games"""
+    summary = []
+    for overrides in sweep:
+        games = [r for r in results if all(r[name] == value for name, value in overrides.items())]
+        scores = np.array([g["score"] for g in games])
+        survival = np.array([g["survival_time"] for g in games])
+        summary.append({
+            **asdict(SimParams(**overrides)),
+            "games": len(games),
+            "score_mean": float(scores.mean()),
+            "score_p50": float(np.median(scores)),
+            "survival_mean": float(survival.mean()),
+            "survival_p50": float(np.median(survival)),
+            "deaths": sum(g["died"] for g in games),
+            "step_us_mean": float(np.mean([g["step_us_mean"] for g in games])),
+            "step_us_max": float(max(g["step_us_max"] for g in games)),
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless games in parallel")
+    parser.add_argument("--games", type=positive_int, default=100, help="games per parameter set")
+    parser.add_argument("--param", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="sweep a SimParams field over these values; repeat to combine")
+    parser.add_argument("--bot", default="dodge", choices=sorted(BOTS))
+    parser.add_argument("--seed", type=int, default=0,
+                        help="seed of each set's first game; later games count up from it")
+    parser.add_argument("--max-time", type=float, default=60.0,
+                        help="seconds of game time before a game is stopped")
+    parser.add_argument("--workers", type=positive_int, default=os.cpu_count(),
+                        help="worker processes (default: one per core)")
+    parser.add_argument("--output", default="batch_results.json",
+                        help="results file, .json or .csv")
+    args = parser.parse_args()
+
+    sweep = parse_sweep(args.param)
+    # Every parameter set plays the same seeds, so differences come from the parameters
+    jobs = [(i, overrides, args.bot, args.seed + i % args.games, args.max_time)
+            for i, overrides in enumerate(o for o in sweep for _ in range(args.games))]
+    print(f"Running {len(jobs)} games ({len(sweep)} parameter sets) on {args.workers} workers")
+
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        chunksize = max(1, len(jobs) // (args.workers * 8))
+        for result in executor.map(run_game, jobs, chunksize=chunksize):
+            results.append(result)
+            if len(results) % max(1, len(jobs) // 10) == 0:
+                print(f"  {len(results)}/{len(jobs)} games")
+    elapsed = time.perf_counter() - started
+    if not results:
+        print("No games were played; nothing to write")
+        return
+    steps = sum(r["steps"] for r in results)
+    print(f"Finished in {elapsed:.1f}s ({steps / elapsed:,.0f} steps/s)")
+
+    summary = summarize(results, sweep)
+    for row in summary:
+        swept = ", ".join(f"{name}={row[name]:g}" for name in sweep[0]) or "defaults"
+        print(f"  {swept}: score {row['score_mean']:.1f}, survived {row['survival_mean']:.1f}s, "
+              f"{row['deaths']}/{row['games']} died")
+
+    if args.output.endswith(".csv"):
+        with open(args.output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+    else:
+        with open(args.output, "w") as f:
+            json.dump({
+                "meta": {"bot": args.bot, "seed": args.seed, "max_time": args.max_time,
+                         "games_per_set": args.games, "elapsed": elapsed},
+                "summary": summary,
+                "games": results,
+            }, f, indent=2)
+    print(f"Wrote results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
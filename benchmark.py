@@ -0,0 +1,353 @@
+"""
+Reproducible benchmarks for the game loop at scaled entity counts.
+
+Runs the game logic and renderer headlessly with SDL's dummy drivers and a
+seeded RNG, and reports nanoseconds per frame for each phase, memory blocks
+allocated per frame (those still alive when the frame ends), how far traced
+memory peaks above its level at the start of each frame, and peak traced
+memory, plus the memory and read cost of each entity layout. Results are
+written as JSON and can be compared against a stored baseline:
+
+    python benchmark.py --output baseline.json
+    python benchmark.py --baseline baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+from constants import BULLET_SPEED, WINDOW_WIDTH, WINDOW_HEIGHT, FIXED_TIMESTEP, Entity
+from entity_store import EntityStore
+from particles import ParticleSystem, Burst
+from profiler import FrameProfiler, PHASES
+from simulation import Simulation
+from swarm_ai import SwarmAI, PROFILES
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+# Above this many entities the all-pairs matrix gets too big to be worth timing
+MAX_BRUTE_FORCE = 2000
+
+
+def populate(sim: Simulation, count: int, seed: int):
+    """Replace the current wave with count aliens and count bullets spread over the screen"""
+    rng = np.random.default_rng(seed)
+    sim.reset()
+    alien_width, alien_height = sim.sprite_sizes["alien"]
+    bullet_width, bullet_height = sim.sprite_sizes["bullet"]
+    sim.aliens.clear()
+    # Stress counts go well past the in-game bullet cap
+    sim.bullets.max_capacity = None
+    sim.aliens.spawn_many(
+        rng.uniform(0, WINDOW_WIDTH - alien_width, count),
+        rng.uniform(0, WINDOW_HEIGHT * 0.7, count),
+        alien_width, alien_height)
+    sim.bullets.spawn_many(
+        rng.uniform(0, WINDOW_WIDTH - bullet_width, count),
+        rng.uniform(WINDOW_HEIGHT * 0.2, WINDOW_HEIGHT, count),
+        bullet_width, bullet_height, 0, -BULLET_SPEED)
+
+
+def collision_path(hash_queries: int, brute_force_queries: int) -> str:
+    """Name the pair test that answered a run's collision queries: hash, brute or mixed"""
+    if hash_queries and brute_force_queries:
+        return "mixed"
+    return "hash" if hash_queries else "brute"
+
+
+def measure(setup, frame, frames: int, repeats: int, profiler: FrameProfiler) -> dict:
+    """
+    Time a frame function and trace its memory use.
+
+    Args:
+        setup: Called before each repeat to rebuild the starting state
+        frame: Called once per frame; may lap phases on profiler
+        frames: Frames per repeat
+        repeats: Number of times the state is rebuilt and run
+
+    Returns:
+        dict: Median ns_per_frame per phase, and from tracemalloc:
+            alloc_blocks_per_frame: Mean memory blocks allocated in a frame and still
+                alive at its end, from snapshot statistics. Snapshots only see live
+                blocks, so ones allocated and freed within the frame are missed.
+            peak_growth_bytes_per_frame: Mean rise of traced memory's peak over its
+                level at the start of a frame, which does include short-lived blocks
+            peak_bytes: Peak traced memory over the whole pass
+    """
+    # Timing pass, without tracemalloc slowing things down
+    profiler.reset(capacity=frames * repeats)
+    for _ in range(repeats):
+        setup()
+        for _ in range(frames):
+            profiler.begin_frame()
+            frame()
+            profiler.end_frame()
+    # Medians are far less sensitive to scheduler noise than means
+    rows = profiler.recorded()
+    ns_per_frame = {"total": float(np.median(rows["total_ms"])) * 1e6}
+    for phase in PHASES:
+        column = rows[f"{phase}_ms"]
+        if column.any():
+            ns_per_frame[phase] = float(np.median(column)) * 1e6
+
+    # Memory pass
+    setup()
+    tracemalloc.start()
+    # Leave out the snapshots' own memory
+    own = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    growth = 0
+    blocks = 0
+    peak_bytes = 0
+    for _ in range(frames):
+        before = tracemalloc.take_snapshot().filter_traces(own)
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        frame()
+        _, peak = tracemalloc.get_traced_memory()
+        growth += peak - start
+        peak_bytes = max(peak_bytes, peak)
+        after = tracemalloc.take_snapshot().filter_traces(own)
+        blocks += sum(max(0, stat.count_diff) for stat in after.compare_to(before, "lineno"))
+        del before, after
+    tracemalloc.stop()
+
+    return {
+        "ns_per_frame": ns_per_frame,
+        "alloc_blocks_per_frame": blocks / frames,
+        "peak_growth_bytes_per_frame": growth / frames,
+        "peak_bytes": peak_bytes,
+    }
+
+
+def run_benchmarks(sizes, frames: int, repeats: int, seed: int) -> dict:
+    # Games write high scores and a sprite cache; keep both out of the working tree
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as scratch:
+        return _run_benchmarks(sizes, frames, repeats, seed, scratch)
+
+
+def _run_benchmarks(sizes, frames: int, repeats: int, seed: int, scratch: str) -> dict:
+    files = {"scores_path": os.path.join(scratch, "highscores.dat"),
+             "cache_dir": os.path.join(scratch, "sprites")}
+    profiler = FrameProfiler()
+    sim = Simulation(seed=seed)
+    sim.profiler = profiler
+    results = {}
+
+    def step():
+        sim.step(FIXED_TIMESTEP)
+        sim.events.clear()
+
+    for count in sizes:
+        for mode in ("hash", "brute"):
+            if mode == "brute" and count > MAX_BRUTE_FORCE:
+                continue
+            sim.collision_mode = mode
+            queries = (sim.hash_queries, sim.brute_force_queries)
+            result = measure(lambda: populate(sim, count, seed), step, frames, repeats, profiler)
+            path = collision_path(sim.hash_queries - queries[0],
+                                  sim.brute_force_queries - queries[1])
+            # Small queries skip the hash (see BRUTE_FORCE_MAX_TESTS); say when that happened
+            name = mode if path == mode else f"{mode}->{path}"
+            results[f"update/{name}/{count}"] = result
+    sim.collision_mode = "hash"
+
+    # Steering alone, for each swarm profile
+    for count in sizes:
+        for profile in sorted(PROFILES):
+            swarm = SwarmAI(profile)
+            target_x = WINDOW_WIDTH / 2
+            target_y = WINDOW_HEIGHT - 40
+            results[f"swarm/{profile}/{count}"] = measure(
+                lambda: populate(sim, count, seed),
+                lambda: swarm.steer(sim.aliens, target_x, target_y),
+                frames, repeats, profiler)
+
+    results["spawn_aliens"] = measure(lambda: sim.seed(seed), sim.spawn_aliens,
+                                      frames, repeats, profiler)
+
+    # Rendering needs a Game; the dummy video driver gives it an offscreen display
+    from main import Game, PLAYING
+    game = Game(seed=seed, sound=False, **files)
+    game.game_state = PLAYING
+    for count in sizes:
+        results[f"draw_game/{count}"] = measure(
+            lambda: populate(game.sim, count, seed), game.draw_game, frames, repeats, profiler)
+
+    # Particles alone: count of them alive, moved and drawn every frame
+    for count in sizes:
+        particles = ParticleSystem(capacity=count, seed=seed)
+        burst = Burst(count, speed=(0, 200), life=(5, 10), colors=[(255, 150, 40)])
+
+        def particle_frame():
+            particles.update(FIXED_TIMESTEP)
+            particles.draw(game.screen)
+            profiler.lap("particles")
+
+        def emit():
+            particles.clear()
+            particles.emit(WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2, burst)
+
+        results[f"particles/{count}"] = measure(emit, particle_frame, frames, repeats, profiler)
+
+    # Drawing at the pixel art's native resolution and scaling up once per frame.
+    # This reopens the display, so it runs last.
+    from render_target import BLIT
+    low = Game(seed=seed, sound=False, render_scale=2, present=BLIT, **files)
+    low.game_state = PLAYING
+    for count in sizes:
+        results[f"draw_game/native/{count}"] = measure(
+            lambda: populate(low.sim, count, seed), low.draw_game, frames, repeats, profiler)
+    game.highscores.close()
+    low.highscores.close()
+    return results
+
+
+@dataclass
+class DictEntity:
+    """The original constants.Entity layout, with a per-instance __dict__, for comparison"""
+    x: float
+    y: float
+    width: int
+    height: int
+    velocity_x: float = 0
+    velocity_y: float = 0
+    dead: bool = False
+
+
+def traced_bytes(build) -> int:
+    """Bytes still allocated after build() returns, keeping its result alive"""
+    tracemalloc.start()
+    start, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    end, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return end - start
+
+
+def entity_benchmarks(count: int, seed: int) -> dict:
+    """
+    Compare entity layouts: memory per entity and the cost of summing x over all of them.
+
+    Returns:
+        dict: Layout name -> bytes_per_entity and ns_per_entity
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, WINDOW_WIDTH, count).tolist()
+    y = rng.uniform(0, WINDOW_HEIGHT, count).tolist()
+
+    def objects(cls):
+        return [cls(px, py, 32, 32, 0.0, 50.0) for px, py in zip(x, y)]
+
+    def store():
+        entities = EntityStore(capacity=count)
+        entities.spawn_many(x, y, 32, 32, 0.0, 50.0)
+        return entities
+
+    layouts = {
+        "dataclass": (lambda: objects(DictEntity), lambda e: sum(entity.x for entity in e)),
+        "slots_dataclass": (lambda: objects(Entity), lambda e: sum(entity.x for entity in e)),
+        "store_views": (store, lambda e: sum(entity.x for entity in e)),
+        "store_columns": (store, lambda e: float(e.x.sum())),
+    }
+    results = {}
+    for name, (build, read) in layouts.items():
+        entities = build()
+        repeats = max(1, 1000000 // count)
+        seconds = min(timeit.repeat(lambda: read(entities), number=repeats, repeat=3)) / repeats
+        results[name] = {
+            "bytes_per_entity": traced_bytes(build) / count,
+            "ns_per_entity": seconds * 1e9 / count,
+        }
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Find benchmarks whose total time per frame grew by more than threshold.
+
+    Returns:
+        list: (name, baseline ns, current ns) for each regression
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        old = baseline[name]["ns_per_frame"]["total"]
+        new = result["ns_per_frame"]["total"]
+        if new > old * (1 + threshold):
+            regressions.append((name, old, new))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game loop")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated alien/bullet counts")
+    parser.add_argument("--frames", type=int, default=60, help="frames per repeat")
+    parser.add_argument("--repeats", type=int, default=3, help="repeats per benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--entities", type=int, default=10000,
+                        help="entity count for the layout memory/access comparison")
+    parser.add_argument("--output", default=None, help="write results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare against this results file")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="allowed slowdown against the baseline, as a fraction")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    started = time.perf_counter()
+    results = run_benchmarks(sizes, args.frames, args.repeats, args.seed)
+
+    print(f"{'benchmark':<28}{'ns/frame':>14}{'new blocks':>12}{'peak growth B':>16}"
+          f"{'peak KiB':>12}")
+    for name, result in results.items():
+        print(f"{name:<28}{result['ns_per_frame']['total']:>14,.0f}"
+              f"{result['alloc_blocks_per_frame']:>12,.1f}{result['peak_growth_bytes_per_frame']:>16,.0f}{result['peak_bytes'] / 1024:>12,.1f}")
+    entities = entity_benchmarks(args.entities, args.seed)
+    print(f"\n{'entity layout':<28}{'bytes/entity':>14}{'ns/entity read':>16}")
+    for name, result in entities.items():
+        print(f"{name:<28}{result['bytes_per_entity']:>14,.1f}{result['ns_per_entity']:>16,.1f}")
+    print(f"Finished in {time.perf_counter() - started:.1f}s")
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pygame": pygame.version.ver,
+            "machine": platform.machine(),
+            "seed": args.seed,
+            "frames": args.frames,
+            "repeats": args.repeats,
+        },
+        "results": results,
+        "entities": entities,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old:,.0f} -> {new:,.0f} ns/frame ({new / old - 1:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,69 @@
-import RPi.GPIO as GPIO
+import queue
 import time
+from typing import List
+
 
 class ButtonController:
-    def __init__(self, pin: int = 17):
+    def __init__(self, pin: int = 17, event_driven: bool = True, gpio=None):
         """
         Initialize the button controller.
         
         Args:
             pin: GPIO pin number for the button (BCM numbering)
+            event_driven: Collect presses with edge-detection callbacks instead of polling
+            gpio: GPIO backend; RPi.GPIO if None, or a mock_gpio.MockGPIO off-device
         """
+        if gpio is None:
+            # Imported here so the mock backend works without the hardware library
+            import RPi.GPIO as gpio
+        self.gpio = gpio
         self.pin = pin
         
         # Setup GPIO
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setwarnings(False)  # Disable warnings
+        gpio.setmode(gpio.BCM)
+        gpio.setwarnings(False)  # Disable warnings
         
         # Configure with pull-up resistor
         # When button is pressed, it will connect to ground (GPIO.LOW)
-        GPIO.setup(self.pin, GPIO.IN, pull_up_down=GPIO.PUD_UP)
+        gpio.setup(self.pin, gpio.IN, pull_up_down=gpio.PUD_UP)
         
         # Debouncing variables
         self.last_press_time = 0
         self.debounce_time = 0.05  # Reduce debounce time to 50ms for better responsiveness
         
+        # Timestamps of falling edges, pushed from the GPIO callback thread
+        self.events: "queue.SimpleQueue[float]" = queue.SimpleQueue()
+        self.event_driven = False
+        if event_driven:
+            try:
+                gpio.add_event_detect(self.pin, gpio.FALLING, callback=self._on_edge)
+                self.event_driven = True
+            except RuntimeError as e:
+                print(f"Edge detection unavailable ({e}) - polling the button instead")
+        
+    def _on_edge(self, channel: int):
+        """GPIO callback: record when the pin went low. Runs on the GPIO thread."""
+        self.events.put(time.monotonic())
+        
+    def get_presses(self) -> List[float]:
+        """
+        Drain the press events received since the last call, with debouncing.
+        Presses shorter than a frame are still reported.
+        
+        Returns:
+            list: Timestamps (time.monotonic) of each debounced press, oldest first
+        """
+        presses = []
+        while True:
+            try:
+                timestamp = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if timestamp - self.last_press_time > self.debounce_time:
+                self.last_press_time = timestamp
+                presses.append(timestamp)
+        return presses
+        
     def is_pressed(self) -> bool:
         """
         Check if button is pressed, with debouncing.
@@ -31,10 +72,10 @@ class ButtonController:
             bool: True if button is pressed, False otherwise
         """
         # Note: With pull-up resistor, GPIO.LOW means button is pressed
-        button_state = GPIO.input(self.pin) == GPIO.LOW
+        button_state = self.gpio.input(self.pin) == self.gpio.LOW
         
         if button_state:
-            current_time = time.time()
+            current_time = time.monotonic()
             if current_time - self.last_press_time > self.debounce_time:
                 self.last_press_time = current_time
                 return True
@@ -42,4 +83,6 @@ class ButtonController:
     
     def cleanup(self):
         """Clean up GPIO on exit"""
-        GPIO.cleanup(self.pin)  # Only clean up our pin
\ No newline at end of file
+        if self.event_driven:
+            self.gpio.remove_event_detect(self.pin)
+        self.gpio.cleanup(self.pin)  # Only clean up our pin
\ No newline at end of file
@@ -5,7 +5,50 @@ PLAYER_SPEED = 200
 BULLET_SPEED = 400
 SHOOT_COOLDOWN = 0.1
 
-@dataclass
+# World constants
+WINDOW_WIDTH = 800
+WINDOW_HEIGHT = 600
+ALIEN_SPEED = 50
+ALIEN_SHOOT_COOLDOWN = 6.0
+SHOOT_CHANCE = 0.005
+COLLISION_RADIUS = 24
+ALIEN_PROJECTILE_SPEED = 150
+
+# Entity pool caps. A bullet crosses the screen in 1.5 s at one shot per
+# SHOOT_COOLDOWN, so at most 16 are ever alive; projectiles leave headroom
+# for large waves. Shots past the cap are dropped.
+MAX_BULLETS = 32
+MAX_ALIEN_PROJECTILES = 128
+
+# Simulation timing
+FIXED_TIMESTEP = 1 / 60     # Seconds of game time per simulation step
+MAX_FRAME_TIME = 0.25       # Longest real frame fed to the simulation, avoids a spiral of death
+
+# Collision detection modes
+SPATIAL_HASH = "hash"       # Uniform-grid broadphase for large queries, see BRUTE_FORCE_MAX_TESTS
+BRUTE_FORCE = "brute"       # Test every pair
+VERIFY = "verify"           # Spatial hash, cross-checked against brute force every frame
+COLLISION_MODE = SPATIAL_HASH
+# In SPATIAL_HASH mode, queries needing at most this many distance tests (query
+# entities times stored entities) test every pair instead: below it building
+# and probing the grid costs more than it saves. With MAX_BULLETS bullets against
+# a normal wave, or the player against anything, a real game stays far below
+# this, so during play the hash path only runs in VERIFY mode or at stress counts.
+BRUTE_FORCE_MAX_TESTS = 16384
+
+# Alien steering profiles (see swarm_ai.PROFILES)
+HOMING = "homing"           # Every alien heads straight for the player
+FLOW_FIELD = "flow"         # Coarse flow field plus separation, for large swarms
+SWARM_PROFILE = HOMING
+
+# Sprite scale factors
+PLAYER_ALIEN_SCALE = 2.0
+BULLET_SCALE = 3.0
+ALIEN_PROJECTILE_SCALE = 3.0
+
+# Slotted: no per-instance __dict__, so instances are smaller and attribute access is faster.
+# Groups of entities live in entity_store.EntityStore columns instead.
+@dataclass(slots=True)
 class Entity:
     x: float
     y: float
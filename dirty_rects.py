@@ -0,0 +1,146 @@
+from typing import Iterable, List, Sequence, Tuple
+import numpy as np
+import pygame
+
+# Side of the square tiles dirty areas are rounded out to, in pixels
+DIRTY_TILE = 32
+
+
+def tile_grid(rects: Sequence, width: int, height: int,
+              tile: int = DIRTY_TILE) -> np.ndarray:
+    """
+    Mark every tile of a width x height screen that any of the rectangles touches.
+
+    Each rectangle adds its corners to a difference grid and two running sums
+    fill in the covered tiles, so the cost is linear in the number of
+    rectangles however much they overlap.
+
+    Args:
+        rects: Rectangles, or an (n, 4) array of x, y, width, height
+
+    Returns:
+        np.ndarray: (rows, cols) boolean grid of dirty tiles
+    """
+    cols = -(-width // tile)
+    rows = -(-height // tile)
+    corners = np.zeros((rows + 1, cols + 1), dtype=np.int32)
+    if len(rects):
+        x, y, w, h = np.asarray(rects, dtype=np.int64).reshape(-1, 4).T
+        drawn = (w > 0) & (h > 0)
+        left = np.clip(x // tile, 0, cols)
+        top = np.clip(y // tile, 0, rows)
+        right = np.clip(-(-(x + w) // tile), 0, cols)
+        bottom = np.clip(-(-(y + h) // tile), 0, rows)
+        drawn &= (right > left) & (bottom > top)
+        left, top, right, bottom = left[drawn], top[drawn], right[drawn], bottom[drawn]
+        stride = cols + 1
+        size = (rows + 1) * stride
+        corners = (np.bincount(top * stride + left, minlength=size)
+                   - np.bincount(top * stride + right, minlength=size)
+                   - np.bincount(bottom * stride + left, minlength=size)
+                   + np.bincount(bottom * stride + right, minlength=size))
+        corners = corners.reshape(rows + 1, cols + 1)
+    return corners.cumsum(axis=0).cumsum(axis=1)[:rows, :cols] > 0
+
+
+def grid_rects(grid: np.ndarray, tile: int = DIRTY_TILE) -> List[pygame.Rect]:
+    """
+    Turn a dirty tile grid into rectangles, one per horizontal run of dirty tiles.
+
+    Returns:
+        list: Non-overlapping rectangles covering every dirty tile
+    """
+    rows, cols = grid.shape
+    padded = np.zeros((rows, cols + 2), dtype=np.int8)
+    padded[:, 1:-1] = grid
+    edges = np.diff(padded, axis=1)
+    start_rows, start_cols = np.nonzero(edges == 1)
+    _, end_cols = np.nonzero(edges == -1)
+    return [pygame.Rect(start * tile, row * tile, (end - start) * tile, tile)
+            for row, start, end in zip(start_rows.tolist(), start_cols.tolist(),
+                                       end_cols.tolist())]
+
+
+class DirtyRectRenderer:
+    """
+    Presents only the parts of the screen that changed since the last frame.
+
+    Each frame, the areas drawn on the previous frame are erased back to the
+    background, the caller redraws the scene and hands over the rectangles it
+    drew, and the union of old and new areas is pushed to the display with
+    pygame.display.update. Dirty areas are rounded out to a coarse tile grid,
+    which keeps the bookkeeping linear in the number of rectangles drawn.
+    When too much of the screen is dirty, a full flip is cheaper than many
+    small updates and is used instead.
+    """
+
+    def __init__(self, screen: pygame.Surface, background: Tuple[int, int, int] = (0, 0, 0),
+                 full_redraw_ratio: float = 0.5, display=None):
+        """
+        Initialize the renderer.
+
+        Args:
+            screen: Display surface to draw on
+            background: Color that erased areas are filled with
+            full_redraw_ratio: Fraction of the screen area above which a full flip is used
+            display: Object with flip() and update(rects), such as a
+                render_target.RenderTarget; pygame.display if None
+        """
+        self.screen = screen
+        self.background = background
+        self.full_redraw_ratio = full_redraw_ratio
+        self.display = display or pygame.display
+        # Tiles drawn on last frame, as a grid and as the rectangles erased next frame
+        self.previous_grid = None
+        self.previous: List[pygame.Rect] = []
+        self.needs_full_redraw = True
+        # Number of full flips and partial updates presented, for profiling
+        self.full_frames = 0
+        self.partial_frames = 0
+
+    def invalidate(self):
+        """Force the next frame to redraw and present the whole screen"""
+        self.needs_full_redraw = True
+
+    def begin_frame(self):
+        """Erase everything drawn last frame, ready for the scene to be redrawn"""
+        if self.needs_full_redraw:
+            self.screen.fill(self.background)
+            return
+        for rect in self.previous:
+            self.screen.fill(self.background, rect)
+
+    def present(self, drawn: Iterable[pygame.Rect]):
+        """
+        Push this frame to the display.
+
+        Args:
+            drawn: Rectangles of everything drawn this frame
+        """
+        current = list(drawn)
+        width, height = self.screen.get_size()
+        limit = width * height * self.full_redraw_ratio
+        # Checked before any tiling; overlaps count twice, which only errs towards a full flip
+        if sum(rect.width * rect.height for rect in current) > limit:
+            # Too much to track: erase and present the whole screen until it calms down
+            self.previous = [self.screen.get_rect()]
+            self.previous_grid = None
+            self.needs_full_redraw = False
+            self.full_frames += 1
+            self.display.flip()
+            return
+
+        grid = tile_grid(np.fromiter((value for rect in current for value in rect),
+                                     dtype=np.int64, count=4 * len(current)), width, height)
+        dirty = grid if self.previous_grid is None else grid | self.previous_grid
+        full = self.needs_full_redraw or self.previous_grid is None
+        self.previous = grid_rects(grid)
+        self.previous_grid = grid
+        # Tiles overhang the screen edges slightly; that too errs towards a full flip
+        if full or int(dirty.sum()) * DIRTY_TILE * DIRTY_TILE > limit:
+            self.needs_full_redraw = False
+            self.full_frames += 1
+            self.display.flip()
+        else:
+            self.partial_frames += 1
+            self.display.update(grid_rects(dirty))
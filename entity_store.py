@@ -0,0 +1,318 @@
+from typing import Optional
+import numpy as np
+
+
+class EntityView:
+    """
+    Lightweight handle on one row of an EntityStore, with the same attributes
+    as constants.Entity. Reads and writes go straight to the store's columns.
+    A view is only valid until rows are next removed or reordered.
+    """
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: "EntityStore", index: int):
+        self.store = store
+        self.index = index
+
+    @property
+    def x(self) -> float:
+        return float(self.store._x[self.index])
+
+    @x.setter
+    def x(self, value: float):
+        self.store._x[self.index] = value
+
+    @property
+    def y(self) -> float:
+        return float(self.store._y[self.index])
+
+    @y.setter
+    def y(self, value: float):
+        self.store._y[self.index] = value
+
+    @property
+    def width(self) -> int:
+        return int(self.store._width[self.index])
+
+    @property
+    def height(self) -> int:
+        return int(self.store._height[self.index])
+
+    @property
+    def velocity_x(self) -> float:
+        return float(self.store._velocity_x[self.index])
+
+    @velocity_x.setter
+    def velocity_x(self, value: float):
+        self.store._velocity_x[self.index] = value
+
+    @property
+    def velocity_y(self) -> float:
+        return float(self.store._velocity_y[self.index])
+
+    @velocity_y.setter
+    def velocity_y(self, value: float):
+        self.store._velocity_y[self.index] = value
+
+    @property
+    def dead(self) -> bool:
+        """Removed entities are compacted out of the store, so only a stale view is dead"""
+        return self.index >= self.store.count
+
+    def __repr__(self) -> str:
+        return (f"EntityView(x={self.x}, y={self.y}, width={self.width}, height={self.height}, "
+                f"velocity_x={self.velocity_x}, velocity_y={self.velocity_y})")
+
+
+class EntityStore:
+    """
+    Structure-of-arrays storage for a group of entities of the same kind.
+
+    Every field of ``constants.Entity`` lives in its own NumPy column, so a whole
+    group can be moved, steered and culled with a few array operations instead
+    of a Python loop over dataclass instances.
+
+    With a max_capacity the store acts as a fixed-size pool: every row is
+    allocated up front, spawning past the cap is dropped and counted, and the
+    high-water mark shows how much of the pool was actually needed.
+    """
+
+    def __init__(self, capacity: int = 64, max_capacity: Optional[int] = None):
+        """
+        Initialize an empty store.
+
+        Args:
+            capacity: Number of rows to preallocate. The store grows as needed.
+            max_capacity: Most entities the store will hold; unlimited if None.
+                All rows are preallocated when set.
+        """
+        self.count = 0
+        self.max_capacity = max_capacity
+        self.high_water = 0     # Most entities alive at once since the last reset_stats()
+        self.dropped = 0        # Spawns refused because the store was full
+        self._allocate(max(1, capacity if max_capacity is None else max_capacity))
+
+    def _allocate(self, capacity: int):
+        self._x = np.zeros(capacity, dtype=np.float64)
+        self._y = np.zeros(capacity, dtype=np.float64)
+        self._width = np.zeros(capacity, dtype=np.int64)
+        self._height = np.zeros(capacity, dtype=np.int64)
+        self._velocity_x = np.zeros(capacity, dtype=np.float64)
+        self._velocity_y = np.zeros(capacity, dtype=np.float64)
+        # Positions before the last integrate() call, used for render interpolation
+        self._prev_x = np.zeros(capacity, dtype=np.float64)
+        self._prev_y = np.zeros(capacity, dtype=np.float64)
+
+    def _columns(self):
+        return (self._x, self._y, self._width, self._height,
+                self._velocity_x, self._velocity_y, self._prev_x, self._prev_y)
+
+    def _reserve(self, needed: int):
+        capacity = len(self._x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        old = self._columns()
+        self._allocate(capacity)
+        for new_column, old_column in zip(self._columns(), old):
+            new_column[:self.count] = old_column[:self.count]
+
+    # Live views of the occupied rows. In-place writes go straight to storage.
+    @property
+    def x(self) -> np.ndarray:
+        return self._x[:self.count]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self._y[:self.count]
+
+    @property
+    def width(self) -> np.ndarray:
+        return self._width[:self.count]
+
+    @property
+    def height(self) -> np.ndarray:
+        return self._height[:self.count]
+
+    @property
+    def velocity_x(self) -> np.ndarray:
+        return self._velocity_x[:self.count]
+
+    @property
+    def velocity_y(self) -> np.ndarray:
+        return self._velocity_y[:self.count]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> EntityView:
+        """Per-entity access for code that isn't vectorized; hot paths should use the columns"""
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return EntityView(self, index)
+
+    def __iter__(self):
+        return (EntityView(self, i) for i in range(self.count))
+
+    @property
+    def capacity(self) -> int:
+        """Number of rows currently allocated"""
+        return len(self._x)
+
+    def reset_stats(self):
+        self.high_water = self.count
+        self.dropped = 0
+
+    def _room(self, wanted: int) -> int:
+        """Clamp a spawn of wanted entities to the space left under max_capacity"""
+        if self.max_capacity is None:
+            return wanted
+        room = max(0, self.max_capacity - self.count)
+        if wanted > room:
+            self.dropped += wanted - room
+            return room
+        return wanted
+
+    def spawn(self, x: float, y: float, width: int, height: int,
+              velocity_x: float = 0, velocity_y: float = 0) -> int:
+        """
+        Add a single entity.
+
+        Returns:
+            int: Row index of the new entity, or -1 if the store is full
+        """
+        if not self._room(1):
+            return -1
+        self._reserve(self.count + 1)
+        i = self.count
+        self._x[i] = x
+        self._y[i] = y
+        self._width[i] = width
+        self._height[i] = height
+        self._velocity_x[i] = velocity_x
+        self._velocity_y[i] = velocity_y
+        self._prev_x[i] = x
+        self._prev_y[i] = y
+        self.count += 1
+        self.high_water = max(self.high_water, self.count)
+        return i
+
+    def spawn_many(self, x, y, width, height, velocity_x=0, velocity_y=0):
+        """
+        Add a batch of entities. Scalars are broadcast against the arrays.
+        If the batch doesn't fit under max_capacity, only its first entities are added.
+
+        Args:
+            x, y: Arrays of positions, which also set the batch size
+            width, height, velocity_x, velocity_y: Arrays or scalars
+        """
+        x = np.asarray(x, dtype=np.float64)
+        n = self._room(len(x))
+        if n == 0:
+            return
+        start = self.count
+        self._reserve(start + n)
+        end = start + n
+        for column, values in ((self._x, x), (self._y, y), (self._width, width),
+                               (self._height, height), (self._velocity_x, velocity_x),
+                               (self._velocity_y, velocity_y)):
+            column[start:end] = values[:n] if np.ndim(values) else values
+        self._prev_x[start:end] = self._x[start:end]
+        self._prev_y[start:end] = self._y[start:end]
+        self.count = end
+        self.high_water = max(self.high_water, end)
+
+    def clear(self):
+        """Remove every entity without releasing storage"""
+        self.count = 0
+
+    def center_x(self) -> np.ndarray:
+        return self.x + self.width // 2
+
+    def center_y(self) -> np.ndarray:
+        return self.y + self.height // 2
+
+    def positions(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: An (n, 2) array of top-left positions
+        """
+        return np.column_stack((self.x, self.y))
+
+    def interpolated_positions(self, alpha: float) -> np.ndarray:
+        """
+        Blend the previous and current positions for rendering between steps.
+
+        Args:
+            alpha: 0 for the previous position, 1 for the current one
+
+        Returns:
+            np.ndarray: An (n, 2) array of top-left positions
+        """
+        n = self.count
+        prev = np.column_stack((self._prev_x[:n], self._prev_y[:n]))
+        return prev + (self.positions() - prev) * alpha
+
+    def integrate(self, dt: float):
+        """Advance every position by its velocity over dt seconds"""
+        n = self.count
+        self._prev_x[:n] = self._x[:n]
+        self._prev_y[:n] = self._y[:n]
+        self._x[:n] += self._velocity_x[:n] * dt
+        self._y[:n] += self._velocity_y[:n] * dt
+
+    def home_towards(self, target_x: float, target_y: float, speed: float):
+        """
+        Point every velocity at a target with the given speed.
+        Entities sitting exactly on the target keep their current velocity.
+        """
+        dx = target_x - self.center_x()
+        dy = target_y - self.center_y()
+        distance = np.hypot(dx, dy)
+        moving = distance > 0
+        scale = np.divide(speed, distance, out=np.zeros_like(distance), where=moving)
+        self.velocity_x[moving] = dx[moving] * scale[moving]
+        self.velocity_y[moving] = dy[moving] * scale[moving]
+
+    def outside(self, left: float, top: float, right: float, bottom: float) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: Boolean mask of entities whose position lies outside the bounds
+        """
+        x = self.x
+        y = self.y
+        return (x < left) | (x > right) | (y < top) | (y > bottom)
+
+    def swap_remove(self, index: int):
+        """Remove one entity in O(1) by moving the last row into its slot"""
+        last = self.count - 1
+        if index != last:
+            for column in self._columns():
+                column[index] = column[last]
+        self.count = last
+
+    def compact(self, keep: np.ndarray):
+        """
+        Drop every entity whose entry in keep is False, preserving order.
+
+        Args:
+            keep: Boolean mask over the occupied rows
+        """
+        n = self.count
+        if n == 0:
+            return
+        kept = np.flatnonzero(keep)
+        if len(kept) == n:
+            return
+        m = len(kept)
+        for column in self._columns():
+            column[:m] = column[:n][kept]
+        self.count = m
+
+    def remove(self, mask: np.ndarray):
+        """Drop every entity whose entry in mask is True, preserving order"""
+        self.compact(~np.asarray(mask, dtype=bool))
@@ -0,0 +1,104 @@
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional
+import pygame
+
+# Quality changes when the rolling average of busy time per frame crosses
+# these fractions of the frame budget
+DOWNGRADE_AT = 0.9
+UPGRADE_AT = 0.5
+# Longest wait, in frames, before trying a higher level again
+MAX_UPGRADE_WAIT = 3600
+
+
+@dataclass
+class QualityLevel:
+    """One step of the quality ladder"""
+    name: str
+    star_layers: int    # Parallax layers drawn, slowest first; the first one also clears the screen
+    effects: bool       # Optional visual effects
+
+
+QUALITY_LEVELS: List[QualityLevel] = [
+    QualityLevel("high", star_layers=3, effects=True),
+    QualityLevel("medium", star_layers=2, effects=True),
+    QualityLevel("low", star_layers=1, effects=False),
+]
+
+
+class FramePacer:
+    """
+    Paces frames to a target rate and trades quality for speed when frames overrun.
+
+    Each frame's busy time (everything but the frame limiter's sleep) goes
+    into a rolling window. When the window's average eats most of the frame
+    budget, quality drops one level; when there is plenty of headroom it goes
+    back up. After a change the window refills before the next decision, and
+    every downgrade doubles how long the pacer waits before trying a higher
+    level again, so a board that can't hold a level stops bouncing off it.
+    """
+
+    def __init__(self, target_fps: int = 60, window: int = 60, adaptive: bool = True,
+                 level: int = 0):
+        """
+        Initialize the pacer.
+
+        Args:
+            target_fps: Frame rate to pace to
+            window: Number of recent frames averaged for quality decisions
+            adaptive: Change quality automatically; otherwise level stays fixed
+            level: Starting index into QUALITY_LEVELS
+        """
+        self.target_fps = target_fps
+        self.budget = 1.0 / target_fps
+        self.adaptive = adaptive
+        self.level_index = level
+        self.samples = deque(maxlen=window)
+        self.frames_at_level = 0
+        self.upgrade_wait = window
+        self.changes = 0
+        self._frame_start = time.perf_counter()
+
+    @property
+    def level(self) -> QualityLevel:
+        return QUALITY_LEVELS[self.level_index]
+
+    def tick(self, clock: pygame.time.Clock) -> float:
+        """
+        Wait out the rest of the frame and start timing the next one.
+
+        Returns:
+            float: Seconds since the previous tick
+        """
+        dt = clock.tick(self.target_fps) / 1000.0
+        self._frame_start = time.perf_counter()
+        return dt
+
+    def end_frame(self) -> Optional[QualityLevel]:
+        """
+        Record the busy time of the frame started by the last tick().
+
+        Returns:
+            QualityLevel: The new level if quality changed, else None
+        """
+        self.samples.append(time.perf_counter() - self._frame_start)
+        self.frames_at_level += 1
+        if not self.adaptive or len(self.samples) < self.samples.maxlen:
+            return None
+
+        average = sum(self.samples) / len(self.samples)
+        if average > self.budget * DOWNGRADE_AT and self.level_index < len(QUALITY_LEVELS) - 1:
+            self.level_index += 1
+            self.upgrade_wait = min(self.upgrade_wait * 2, MAX_UPGRADE_WAIT)
+        elif (average < self.budget * UPGRADE_AT and self.level_index > 0
+              and self.frames_at_level >= self.upgrade_wait):
+            self.level_index -= 1
+        else:
+            return None
+        self.samples.clear()
+        self.frames_at_level = 0
+        self.changes += 1
+        print(f"Quality {self.level.name}: {average * 1000:.1f} ms busy per frame "
+              f"against a {self.budget * 1000:.1f} ms budget")
+        return self.level
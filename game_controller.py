@@ -1,6 +1,6 @@
 from typing import Type
-from constants import Entity, SHOOT_COOLDOWN, BULLET_SPEED, PLAYER_SPEED
-import pygame
+from constants import PLAYER_SPEED
+from input_state import FrameInput
 
 def add_controls(game_class: Type) -> Type:
     """
@@ -9,16 +9,25 @@ def add_controls(game_class: Type) -> Type:
     """
     original_init = game_class.__init__
     
-    def new_init(self):
-        original_init(self)
+    def new_init(self, *args, **kwargs):
+        original_init(self, *args, **kwargs)
         self.using_gyro = False
         self.using_button = False
+        # The hardware libraries are slow to import and set up, so that happens on
+        # the startup pool; the keyboard works until each device is ready
+        self.controls_ready = self.startup.submit("controls", init_controls, self)
         
+    def init_controls(self):
         # Try to initialize gyroscope
         try:
             from gyro_controller import GyroController
             self.gyro = GyroController()
             self.using_gyro = True
+            if not self.controls_active:
+                self.gyro.pause()
+                # Play may have started while pausing
+                if self.controls_active:
+                    self.gyro.resume()
             print("Gyroscope initialized successfully!")
         except ImportError:
             print("MPU6050 module not available - using keyboard controls")
@@ -30,8 +39,8 @@ def add_controls(game_class: Type) -> Type:
         try:
             from button_controller import ButtonController
             self.button = ButtonController()
-            self.using_button = True
             self.last_button_state = False
+            self.using_button = True
             print("Button controller initialized successfully!")
         except ImportError:
             print("RPi.GPIO module not available - using keyboard controls for shooting")
@@ -39,60 +48,52 @@ def add_controls(game_class: Type) -> Type:
             print(f"Failed to initialize button: {e}")
             print("Falling back to keyboard controls for shooting")
     
-    original_handle_input = game_class.handle_input
+    original_set_controls_active = game_class.set_controls_active
+    
+    def set_controls_active(self, active: bool):
+        original_set_controls_active(self, active)
+        # Outside of play nothing reads the hardware, so stop the gyro polling the bus
+        if self.using_gyro:
+            if active:
+                self.gyro.resume()
+            else:
+                self.gyro.pause()
+        # Drop presses queued on the menu, so they don't fire the first shot
+        if active and self.using_button and self.button.event_driven:
+            self.button.get_presses()
+    
+    original_read_input = game_class.read_input
     
-    def new_handle_input(self):
+    def new_read_input(self) -> FrameInput:
+        frame_input = original_read_input(self)
+        
         # Handle movement
         if self.using_gyro:
             try:
-                self.player.velocity_x = self.gyro.get_rotation(PLAYER_SPEED)
+                frame_input.gyro_velocity = self.gyro.get_rotation(PLAYER_SPEED)
             except Exception as e:
                 print(f"Error reading gyroscope: {e}")
                 self.using_gyro = False
-                # Fall back to keyboard controls for this frame
-                self._handle_keyboard_movement()
-        else:
-            self._handle_keyboard_movement()
+                # The keyboard state read above is used instead
         
         # Handle shooting
         if self.using_button:
             try:
-                current_button_state = self.button.is_pressed()
-                if current_button_state and not self.last_button_state and self.shoot_timer <= 0:
-                    self._shoot()
-                self.last_button_state = current_button_state
+                if self.button.event_driven:
+                    # Edges were queued by the GPIO callback, so short presses aren't missed
+                    presses = len(self.button.get_presses())
+                else:
+                    current_button_state = self.button.is_pressed()
+                    presses = int(current_button_state and not self.last_button_state)
+                    self.last_button_state = current_button_state
+                frame_input.use_button = True
+                frame_input.button_presses = presses
             except Exception as e:
                 print(f"Error reading button: {e}")
                 self.using_button = False
-                self._handle_keyboard_shooting()
-        else:
-            self._handle_keyboard_shooting()
-    
-    def _handle_keyboard_movement(self):
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_a]:
-            self.player.velocity_x = -PLAYER_SPEED
-        elif keys[pygame.K_d]:
-            self.player.velocity_x = PLAYER_SPEED
-        else:
-            self.player.velocity_x = 0
-    
-    def _handle_keyboard_shooting(self):
-        if pygame.key.get_pressed()[pygame.K_SPACE] and self.shoot_timer <= 0:
-            self._shoot()
-    
-    def _shoot(self):
-        self.shoot_timer = SHOOT_COOLDOWN
-        bullet = Entity(
-            self.player.x + self.player.width // 2 - self.bullet_img.get_width() // 2,
-            self.player.y,
-            self.bullet_img.get_width(),
-            self.bullet_img.get_height(),
-            0,
-            -BULLET_SPEED
-        )
-        self.bullets.append(bullet)
-        self.sound.play_shoot()
+                # The keyboard state read above is used instead
+        
+        return frame_input
     
     def cleanup(self):
         """Clean up GPIO resources"""
@@ -108,10 +109,8 @@ def add_controls(game_class: Type) -> Type:
                 pass
     
     game_class.__init__ = new_init
-    game_class.handle_input = new_handle_input
-    game_class._handle_keyboard_movement = _handle_keyboard_movement
-    game_class._handle_keyboard_shooting = _handle_keyboard_shooting
-    game_class._shoot = _shoot
+    game_class.read_input = new_read_input
+    game_class.set_controls_active = set_controls_active
     game_class.cleanup = cleanup
     
     return game_class
\ No newline at end of file
@@ -1,26 +1,90 @@
+import random
+import threading
 import time
-from mpu6050 import mpu6050
+from collections import deque
+from typing import Optional
+from scipy.signal import butter
+
+
+class FakeMPU6050:
+    """
+    Stand-in for the mpu6050 sensor, for running and testing off-device.
+    Reports a settable rotation rate plus a fixed bias and optional noise.
+    """
+
+    def __init__(self, rotation: float = 0.0, bias: float = 0.0, noise: float = 0.0,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            rotation: Rotation rate reported on the x axis, before bias and noise
+            bias: Constant offset, which calibration should remove
+            noise: Standard deviation of Gaussian noise added to each reading
+            seed: Seed for the noise
+        """
+        self.rotation = rotation
+        self.bias = bias
+        self.noise = noise
+        self.reads = 0
+        self._random = random.Random(seed)
+
+    def get_gyro_data(self) -> dict:
+        self.reads += 1
+        x = self.rotation + self.bias
+        if self.noise:
+            x += self._random.gauss(0, self.noise)
+        return {'x': x, 'y': 0.0, 'z': 0.0}
+
 
 class GyroController:
-    def __init__(self, sensitivity: float = 15.0):
+    def __init__(self, sensitivity: float = 15.0, sample_rate: float = 200.0,
+                 cutoff: float = 10.0, calibration_samples: int = 100,
+                 buffer_size: int = 256, sensor=None):
         """
-        Initialize the gyroscope controller.
-        
+        Initialize the gyroscope controller and start sampling in the background.
+        Returns immediately; calibration runs on the sampling thread.
+
         Args:
             sensitivity: Multiplier for converting gyro readings to player movement
+            sample_rate: Sensor polling rate in Hz
+            cutoff: Low-pass filter cutoff frequency in Hz
+            calibration_samples: Number of readings averaged for the calibration offset
+            buffer_size: Number of recent raw readings kept in the ring buffer
+            sensor: Sensor object with get_gyro_data(); an MPU6050 at 0x68 if None
         """
         try:
-            # Initialize the MPU6050 with default I2C address (0x68)
-            self.sensor = mpu6050(0x68)
-            
+            if sensor is None:
+                # Imported here so the fake sensor works without the hardware library
+                from mpu6050 import mpu6050
+                # Initialize the MPU6050 with default I2C address (0x68)
+                sensor = mpu6050(0x68)
+            self.sensor = sensor
+
             # Set sensitivity multiplier
             self.sensitivity = sensitivity
-            
-            # Calibrate the sensor
+            self.sample_rate = sample_rate
+            self.calibration_samples = calibration_samples
+
+            # First-order Butterworth low-pass, applied one sample at a time
+            b, a = butter(1, cutoff, btype='low', fs=sample_rate)
+            self._b0, self._b1 = float(b[0]), float(b[1])
+            self._a1 = float(a[1])
+
+            # Recent (timestamp, raw reading) pairs; deque appends are thread-safe
+            self.samples = deque(maxlen=buffer_size)
+            # Latest filtered, calibrated reading. Written only by the sampling thread,
+            # and a float assignment is atomic, so readers never need a lock.
+            self.filtered = 0.0
+            self.calibration_offset = 0.0
+            self.calibrated = threading.Event()
+            self.error: Optional[Exception] = None
+
+            self._running = threading.Event()
+            self._running.set()
+            self._stopped = threading.Event()
+            self._thread = threading.Thread(target=self._sample_loop, name="gyro-sampler", daemon=True)
             print("Calibrating gyroscope... Keep the device still.")
-            self.calibration_offset = self._calibrate()
-            print("Calibration complete!")
-            
+            self._thread.start()
+
         except Exception as e:
             print(f"Failed to initialize MPU6050: {e}")
             raise
@@ -29,56 +93,100 @@ class GyroController:
         """
         Calibrate the gyroscope by taking multiple readings at rest.
         Returns the average offset to be subtracted from future readings.
-        
+        Runs on the sampling thread, paced at the sample rate.
+
         Args:
             samples: Number of samples to take for calibration
-            
+
         Returns:
-            float: The average z-axis offset
+            float: The average x-axis offset
         """
         total = 0
+        count = 0
+        period = 1.0 / self.sample_rate
         for _ in range(samples):
+            if self._stopped.is_set():
+                break
             try:
                 gyro_data = self.sensor.get_gyro_data()
                 total += gyro_data['x']
-                time.sleep(0.01)
+                count += 1
             except Exception as e:
                 print(f"Error during calibration: {e}")
-                continue
-        return total / samples
+            time.sleep(period)
+        return total / count if count else 0.0
+
+    def _sample_loop(self):
+        try:
+            self.calibration_offset = self._calibrate(self.calibration_samples)
+            self.calibrated.set()
+            print("Calibration complete!")
+
+            period = 1.0 / self.sample_rate
+            previous_input = 0.0
+            next_time = time.perf_counter()
+            while not self._stopped.is_set():
+                if not self._running.is_set():
+                    # Paused: block without polling the bus
+                    self._running.wait(0.1)
+                    next_time = time.perf_counter()
+                    continue
+
+                raw = self.sensor.get_gyro_data()['x']
+                self.samples.append((time.perf_counter(), raw))
+
+                value = raw - self.calibration_offset
+                self.filtered = (self._b0 * value + self._b1 * previous_input
+                                 - self._a1 * self.filtered)
+                previous_input = value
+
+                next_time += period
+                delay = next_time - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Fell behind; don't try to catch up with a burst of reads
+                    next_time = time.perf_counter()
+        except Exception as e:
+            print(f"Error reading gyroscope: {e}")
+            self.error = e
 
     def get_rotation(self, max_speed: float) -> float:
         """
-        Get the current rotation rate from the gyroscope.
+        Get the current rotation rate from the gyroscope without blocking.
         Movement is inverted so tilting right moves player left and vice versa.
-        
+        Returns 0 until calibration has finished.
+
         Args:
             max_speed: Maximum allowed speed for player movement
-            
+
         Returns:
             float: A value suitable for player movement speed, clamped between -max_speed and max_speed
         """
-        try:
-            # Get gyro data
-            gyro_data = self.sensor.get_gyro_data()
-            z_rotation = gyro_data['x']
-            
-            # Apply calibration offset
-            adjusted_rotation = z_rotation - self.calibration_offset
-            
-            # Apply sensitivity and convert to movement value
-            # Negative sign inverts the movement direction
-            movement = -1 * adjusted_rotation * self.sensitivity
-            
-            # Clamp the value to max_speed
-            return max(min(movement, max_speed), -max_speed)
-            
-        except Exception as e:
-            print(f"Error reading gyroscope: {e}")
-            raise
+        if self.error is not None:
+            raise RuntimeError(f"Gyroscope sampling stopped: {self.error}")
+        if not self.calibrated.is_set():
+            return 0.0
+
+        # Apply sensitivity and convert to movement value
+        # Negative sign inverts the movement direction
+        movement = -1 * self.filtered * self.sensitivity
+
+        # Clamp the value to max_speed
+        return max(min(movement, max_speed), -max_speed)
+
+    def pause(self):
+        """Stop polling the sensor until resume() is called"""
+        self._running.clear()
+
+    def resume(self):
+        """Resume polling the sensor after pause()"""
+        self._running.set()
 
     def cleanup(self):
         """
-        Clean up resources. Currently a placeholder as mpu6050 doesn't require cleanup.
+        Stop the sampling thread.
         """
-        pass
\ No newline at end of file
+        self._stopped.set()
+        self._running.set()
+        self._thread.join(timeout=1.0)
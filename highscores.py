@@ -0,0 +1,296 @@
+import argparse
+import heapq
+import itertools
+import os
+import queue
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+import numpy as np
+
+# Where session results are kept between runs
+SCORES_PATH = "highscores.dat"
+# Leaderboard entries kept in memory
+TOP_N = 10
+# The log is compacted once this many sessions were added since it last was...
+COMPACT_AT = 50000
+# ...down to the best KEEP_BEST and the most recent KEEP_RECENT of them
+KEEP_BEST = 1000
+KEEP_RECENT = 10000
+
+MAGIC = b"HISC"
+VERSION = 1
+# magic, version, then totals over sessions dropped by compaction:
+# session count, play time, score sum
+HEADER = struct.Struct("<4sHQdQ")
+# finished at (unix time), score, duration in seconds, wave reached, input devices
+RECORD = struct.Struct("<dIfHB")
+# The same layout as a NumPy dtype, so the log can be read as one array
+RECORD_DTYPE = np.dtype([("finished", "<f8"), ("score", "<u4"), ("duration", "<f4"),
+                         ("wave", "<u2"), ("devices", "u1")])
+
+# Input device bits
+KEYBOARD = 1
+GYRO = 2
+BUTTON = 4
+
+
+def input_devices(frame_input) -> int:
+    """Bitmask of the devices that drove one frame's input.FrameInput"""
+    devices = GYRO if frame_input.gyro_velocity is not None else 0
+    if frame_input.use_button:
+        devices |= BUTTON
+    # Whatever the hardware doesn't cover falls back to the keyboard
+    if frame_input.gyro_velocity is None or not frame_input.use_button:
+        devices |= KEYBOARD
+    return devices
+
+
+def device_names(devices: int) -> str:
+    names = [name for bit, name in ((KEYBOARD, "keyboard"), (GYRO, "gyro"), (BUTTON, "button"))
+             if devices & bit]
+    return "+".join(names) or "none"
+
+
+@dataclass
+class Session:
+    """One finished game"""
+    score: int
+    duration: float
+    wave: int
+    devices: int
+    finished: float = 0.0       # Unix time; filled in on submit if left at 0
+
+
+class HighScoreStore:
+    """
+    Session results in an append-only binary log, with the leaderboard and
+    totals kept in memory.
+
+    Opening the store maps the log and finds the top scores with one
+    partition over the score column, so startup stays fast however many
+    sessions the cabinet has seen. New sessions update the in-memory
+    leaderboard at once and are appended to the log by a writer thread, which
+    also compacts the log each time it grows by COMPACT_AT sessions. A crash can
+    at most cut the last record short, and a short record is dropped on the
+    next open; a log that can't be read at all is moved aside and the store
+    starts empty.
+    """
+
+    def __init__(self, path: str = SCORES_PATH, top_n: int = TOP_N,
+                 compact_at: int = COMPACT_AT):
+        """
+        Open the store, creating the log on the first write if it doesn't exist.
+
+        Args:
+            path: Log file
+            top_n: Number of leaderboard entries kept
+            compact_at: Sessions added since the last compaction that trigger the next
+        """
+        self.path = path
+        self.top_n = top_n
+        self.compact_at = compact_at
+        # Min-heap of (score, -finished, sequence, Session): the weakest entry is
+        # on top, and of two equal scores the later game is the weaker
+        self._top = []
+        self._sequence = itertools.count()
+        self.sessions = 0
+        self.play_time = 0.0
+        self.score_sum = 0
+        self.best = 0
+        self.logged = 0
+        # Records not yet through a compaction; all of an existing log counts
+        self.uncompacted = 0
+        self.compactions = 0
+        self._load()
+
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="highscores", daemon=True)
+        self._writer.start()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        size = os.path.getsize(self.path)
+        with open(self.path, "rb") as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            # Such as a crash between creating the log and writing its header
+            self._set_aside("is too short to hold a header")
+            return
+        magic, version, sessions, play_time, score_sum = HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            self._set_aside(f"is not a version {VERSION} high score log")
+            return
+        self.sessions, self.play_time, self.score_sum = sessions, play_time, score_sum
+
+        count = (size - HEADER.size) // RECORD.size
+        if HEADER.size + count * RECORD.size != size:
+            # Drop a record cut short by a crash, so appends stay aligned
+            with open(self.path, "r+b") as f:
+                f.truncate(HEADER.size + count * RECORD.size)
+        self.logged = count
+        self.uncompacted = count
+        if count == 0:
+            return
+        records = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r",
+                            offset=HEADER.size, shape=(count,))
+        scores = records["score"]
+        self.sessions += count
+        self.play_time += float(records["duration"].sum(dtype=np.float64))
+        self.score_sum += int(scores.sum(dtype=np.uint64))
+        # Only the best top_n records become Python objects
+        best = np.argpartition(scores, -self.top_n)[-self.top_n:] if count > self.top_n \
+            else np.arange(count)
+        for record in records[best]:
+            self._push(Session(int(record["score"]), float(record["duration"]),
+                               int(record["wave"]), int(record["devices"]),
+                               float(record["finished"])))
+        del records
+
+    def _set_aside(self, problem: str):
+        """Move an unreadable log out of the way, so the store starts empty without losing it"""
+        moved = f"{self.path}.bad-{time.strftime('%Y%m%d-%H%M%S')}"
+        print(f"{self.path} {problem}")
+        try:
+            os.replace(self.path, moved)
+            print(f"Moved it to {moved} and started a new high score log")
+        except OSError as e:
+            print(f"Could not move it aside: {e}")
+
+    def _push(self, session: Session) -> bool:
+        self.best = max(self.best, session.score)
+        entry = (session.score, -session.finished, next(self._sequence), session)
+        if len(self._top) < self.top_n:
+            heapq.heappush(self._top, entry)
+            return True
+        if entry[:2] > self._top[0][:2]:
+            heapq.heapreplace(self._top, entry)
+            return True
+        return False
+
+    def submit(self, session: Session) -> Optional[int]:
+        """
+        Record a finished game. Only the in-memory leaderboard is touched
+        here; the write happens on the writer thread.
+
+        Returns:
+            int: The session's 1-based leaderboard rank, or None if it didn't place
+        """
+        if not session.finished:
+            session.finished = time.time()
+        self.sessions += 1
+        self.play_time += session.duration
+        self.score_sum += session.score
+        placed = self._push(session)
+        self._queue.put(session)
+        if not placed:
+            return None
+        return next(rank for rank, entry in enumerate(self.leaderboard(), 1) if entry is session)
+
+    def leaderboard(self) -> List[Session]:
+        """Best sessions, highest score first; ties go to the earlier game"""
+        return [entry[-1] for entry in sorted(self._top, reverse=True)]
+
+    @property
+    def mean_score(self) -> float:
+        return self.score_sum / self.sessions if self.sessions else 0.0
+
+    def close(self):
+        """Finish pending writes"""
+        self._queue.put(None)
+        self._writer.join()
+
+    def _write_loop(self):
+        while True:
+            session = self._queue.get()
+            if session is None:
+                return
+            batch = [session]
+            # Sessions that queued up meanwhile go out in the same write
+            while not self._queue.empty():
+                session = self._queue.get()
+                if session is None:
+                    self._append(batch)
+                    return
+                batch.append(session)
+            self._append(batch)
+
+    def _append(self, batch: List[Session]):
+        try:
+            if not os.path.exists(self.path):
+                with open(self.path, "wb") as f:
+                    f.write(HEADER.pack(MAGIC, VERSION, 0, 0.0, 0))
+            with open(self.path, "ab") as f:
+                f.write(b"".join(RECORD.pack(s.finished, s.score, s.duration, s.wave, s.devices)
+                                 for s in batch))
+                f.flush()
+                os.fsync(f.fileno())
+            self.logged += len(batch)
+            self.uncompacted += len(batch)
+            # Compaction can keep up to KEEP_BEST + KEEP_RECENT records, so counting
+            # the whole log would compact on every write once compact_at is below that
+            if self.uncompacted >= self.compact_at:
+                self.compact()
+        except OSError as e:
+            print(f"Failed to save session results: {e}")
+
+    def compact(self):
+        """
+        Rewrite the log keeping the best KEEP_BEST and the most recent
+        KEEP_RECENT sessions. The dropped sessions are folded into the
+        header's totals, so the overall stats don't change. The new log
+        replaces the old one atomically.
+        """
+        with open(self.path, "rb") as f:
+            magic, version, sessions, play_time, score_sum = HEADER.unpack(f.read(HEADER.size))
+            records = np.fromfile(f, dtype=RECORD_DTYPE)
+        keep = np.zeros(len(records), dtype=bool)
+        keep[-KEEP_RECENT:] = True
+        if len(records) > KEEP_BEST:
+            keep[np.argpartition(records["score"], -KEEP_BEST)[-KEEP_BEST:]] = True
+        else:
+            keep[:] = True
+        dropped = records[~keep]
+        sessions += len(dropped)
+        play_time += float(dropped["duration"].sum(dtype=np.float64))
+        score_sum += int(dropped["score"].sum(dtype=np.uint64))
+
+        temporary = self.path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(magic, version, sessions, play_time, score_sum))
+            records[keep].tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self.logged = int(keep.sum())
+        self.uncompacted = 0
+        self.compactions += 1
+        print(f"Compacted high score log: kept {self.logged} of {len(records)} sessions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the high score leaderboard")
+    parser.add_argument("path", nargs="?", default=SCORES_PATH, help="high score log")
+    parser.add_argument("--top", type=int, default=TOP_N, help="leaderboard entries to show")
+    parser.add_argument("--compact", action="store_true", help="compact the log now")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    store = HighScoreStore(args.path, top_n=args.top)
+    loaded = time.perf_counter() - start
+    if args.compact and store.logged:
+        store.compact()
+    store.close()
+    print(f"{store.sessions} sessions, {store.play_time / 3600:.1f} hours played, "
+          f"mean score {store.mean_score:.1f} (loaded {store.logged} records in {loaded * 1000:.1f} ms)")
+    for rank, session in enumerate(store.leaderboard(), 1):
+        finished = time.strftime("%Y-%m-%d %H:%M", time.localtime(session.finished))
+        print(f"{rank:>3}. {session.score:>6}  wave {session.wave:<3} {session.duration:>7.1f}s  "
+              f"{device_names(session.devices):<16} {finished}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Optional
+from constants import PLAYER_SPEED
+
+
+@dataclass
+class FrameInput:
+    """
+    Everything the player did in one frame, from whichever devices are in use.
+
+    Game.handle_input fills one of these from the keyboard, gyroscope and
+    button and then applies it; recordings, replays and bots produce the same
+    structure, so they all drive the simulation through the same path.
+    """
+    left: bool = False                      # A key held
+    right: bool = False                     # D key held
+    fire: bool = False                      # Space held
+    gyro_velocity: Optional[float] = None   # Gyro movement; None when the keyboard steers
+    use_button: bool = False                # The hardware button, not Space, controls shooting
+    button_presses: int = 0                 # Debounced button presses since the last frame
+
+
+def apply_input(sim, frame_input: FrameInput):
+    """
+    Turn a frame's input into player movement and shots.
+
+    Args:
+        sim: The simulation.Simulation being controlled
+        frame_input: Input for this frame
+    """
+    # Player movement
+    if frame_input.gyro_velocity is not None:
+        sim.player.velocity_x = frame_input.gyro_velocity
+    elif frame_input.left:
+        sim.player.velocity_x = -PLAYER_SPEED
+    elif frame_input.right:
+        sim.player.velocity_x = PLAYER_SPEED
+    else:
+        sim.player.velocity_x = 0
+
+    # Shooting
+    if frame_input.use_button:
+        wants_to_shoot = frame_input.button_presses > 0
+    else:
+        wants_to_shoot = frame_input.fire
+    if wants_to_shoot and sim.shoot_timer <= 0:
+        sim.shoot()
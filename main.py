@@ -1,28 +1,31 @@
 import pygame
 import random
-import math
-from dataclasses import dataclass
+import argparse
 from typing import List, Tuple, Optional
 import sys
+from itertools import repeat
 from game_controller import add_controls
-from constants import Entity, PLAYER_SPEED, BULLET_SPEED, SHOOT_COOLDOWN
-from sound_controller import SoundController
-# Initialize Pygame
-pygame.init()
+from constants import (
+    Entity,
+    FIXED_TIMESTEP, MAX_FRAME_TIME, COLLISION_MODE, SWARM_PROFILE
+)
+from input_state import FrameInput, apply_input
+from simulation import Simulation, SPRITES, SHOOT, EXPLOSION, PLAYER_DIED, load_sprite_sizes
+from asset_manager import AssetManager, CACHE_DIR
+from profiler import FrameProfiler, NullProfiler, profile_session
+from replay import Recorder
+from sound_controller import configure_mixer, create_sound_controller
+from text_cache import TextCache
+from dirty_rects import DirtyRectRenderer
+from starfield import Starfield, NUM_STARS
+from startup import Startup, init_display
+from frame_pacing import FramePacer, QUALITY_LEVELS
+from highscores import HighScoreStore, Session, SCORES_PATH, input_devices
+from particles import ParticleSystem, BURSTS
+from render_target import RenderTarget, SCALED, BLIT, RENDER_SCALES, parse_size
 
-# Constants
-WINDOW_WIDTH = 800
-WINDOW_HEIGHT = 600
-ALIEN_SPEED = 50
-ALIEN_SHOOT_COOLDOWN = 6.0
-SHOOT_CHANCE = 0.005
-COLLISION_RADIUS = 24
-ALIEN_PROJECTILE_SPEED = 150
-
-# Background constants
-NUM_STARS = 200
-STAR_SPEEDS = [50, 100, 150]
-STAR_COLORS = [(100, 100, 100), (150, 150, 150), (255, 255, 255)]
+# Ask for a low-latency mixer before anything initializes it
+configure_mixer()
 
 # Colors
 WHITE = (255, 255, 255)
@@ -33,105 +36,220 @@ MENU = "menu"
 PLAYING = "playing"
 GAME_OVER = "game_over"
 
-# Sprite scale factors
-PLAYER_ALIEN_SCALE = 2.0
-BULLET_SCALE = 3.0
-ALIEN_PROJECTILE_SCALE = 3.0
-
-@dataclass
-class Star:
-    x: float
-    y: float
-    speed: float
-    color: Tuple[int, int, int]
+# Redraw rate outside of play. The menu only animates the starfield; 0 means the
+# screen is static and redrawn only when something changes.
+IDLE_FPS = {
+    MENU: 20,
+    GAME_OVER: 0,
+}
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-        pygame.display.set_caption("Space Invaders")
-        
-        # Load assets
-        self.player_img = pygame.image.load("assets/player.png")
-        self.alien_img = pygame.image.load("assets/alien.png")
-        self.bullet_img = pygame.image.load("assets/bullet.png")
-        self.alien_projectile_img = pygame.image.load("assets/alien_projectile.png")
-        
-        # Scale images
-        self.player_img = pygame.transform.scale(self.player_img, 
-            (int(self.player_img.get_width() * PLAYER_ALIEN_SCALE), 
-             int(self.player_img.get_height() * PLAYER_ALIEN_SCALE)))
-             
-        self.alien_img = pygame.transform.scale(self.alien_img,
-            (int(self.alien_img.get_width() * PLAYER_ALIEN_SCALE),
-             int(self.alien_img.get_height() * PLAYER_ALIEN_SCALE)))
-             
-        self.bullet_img = pygame.transform.scale(self.bullet_img,
-            (int(self.bullet_img.get_width() * BULLET_SCALE),
-             int(self.bullet_img.get_height() * BULLET_SCALE)))
-             
-        self.alien_projectile_img = pygame.transform.scale(self.alien_projectile_img,
-            (int(self.alien_projectile_img.get_width() * ALIEN_PROJECTILE_SCALE),
-             int(self.alien_projectile_img.get_height() * ALIEN_PROJECTILE_SCALE)))
-        
-        # Initialize stars
-        self.stars = self.create_stars()
+    def __init__(self, seed: Optional[int] = None, collision_mode: str = COLLISION_MODE,
+                 dirty_rects: bool = False, num_stars: int = NUM_STARS,
+                 profile: bool = False, record_path: Optional[str] = None,
+                 sound: bool = True, swarm_profile: str = SWARM_PROFILE,
+                 target_fps: int = 60, quality: Optional[str] = None,
+                 scores_path: str = SCORES_PATH, render_scale: int = 1,
+                 window: Optional[Tuple[int, int]] = None, present: str = SCALED,
+                 fullscreen: bool = False, cache_dir: str = CACHE_DIR):
+        self.startup = Startup()
+        with self.startup.phase("display"):
+            init_display()
+            # Everything is drawn at the render target's resolution; the game world
+            # stays WINDOW_WIDTH x WINDOW_HEIGHT and is divided down by view_scale
+            self.display = RenderTarget(render_scale, window, present, fullscreen)
+            self.screen = self.display.surface
+            self.view_scale = render_scale
+            self.view_width, self.view_height = self.display.resolution
+            pygame.display.set_caption("Space Invaders")
+            # Rendered text, and the score it was last rendered for
+            self.text = TextCache()
+            self.score_text = None
+            self.score_text_value = None
+        
+        # Optionally present only the changed parts of the screen during play
+        self.renderer = DirtyRectRenderer(self.screen, display=self.display) if dirty_rects else None
+        
+        # Seed the cosmetic randomness too, so a seeded run looks the same
+        if seed is not None:
+            random.seed(seed)
+        # Each game gets its own seed, drawn from this, so it can be recorded and replayed alone
+        self.game_seeds = random.Random(seed)
+        
+        # Slow, independent loading runs on the startup pool while the splash screen draws
+        self.assets = AssetManager(cache_dir)
+        loading = [self.startup.submit(f"sprite {name}", self.assets.load_scaled, path,
+                                       scale / render_scale)
+                   for name, (path, scale) in SPRITES.items()]
+        loading.append(self.startup.submit("sound", create_sound_controller, sound))
+        loading.append(self.startup.submit(
+            "starfield", Starfield, self.view_width, self.view_height, num_stars,
+            seed=random.getrandbits(32), scale=render_scale))
+        loading.append(self.startup.submit("fonts", self.text.font, "pixel", self.ui(74)))
+        loading.append(self.startup.submit("high scores", HighScoreStore, scores_path))
+        *images, self.sound, self.starfield, _, self.highscores = self.startup.wait(
+            loading, self.draw_splash)
+        
+        # Pack the sprites into one atlas, converted to the display format
+        with self.startup.phase("atlas"):
+            sprites = self.assets.pack_atlas(dict(zip(SPRITES, images)))
+            self.player_img = sprites["player"]
+            self.alien_img = sprites["alien"]
+            self.bullet_img = sprites["bullet"]
+            self.alien_projectile_img = sprites["alien_projectile"]
+        
+        # Optional recording of every game's seed, frame times and input
+        self.record_path = record_path
+        self.recorder = None
+        self.games_recorded = 0
+        
+        # Input devices used this game, and its leaderboard rank once it ends
+        self.session_devices = 0
+        self.last_rank = None
         
         # Initialize game state
-        self.game_state = MENU
+        self._game_state = MENU
+        # Outside of play the screen is only redrawn when due or when this is set
+        self.needs_redraw = True
+        self.last_draw = 0
+        # Whether the hardware controls should be polled; only during play
+        self.controls_active = False
         self.selected_option = 0
         self.menu_options = ["Start Game", "Quit"]
         
-        # Clock for controlling frame rate
+        # Clock for controlling frame rate, and quality scaling to hold it.
+        # A fixed quality level turns the automatic scaling off.
         self.clock = pygame.time.Clock()
+        levels = [level.name for level in QUALITY_LEVELS]
+        self.pacer = FramePacer(target_fps, adaptive=quality is None,
+                                level=levels.index(quality) if quality else 0)
+        # Explosions and muzzle flashes, only shown when the quality level has effects
+        self.particles = ParticleSystem(seed=random.getrandbits(32))
+        self.effects_enabled = True
+        self.apply_quality()
         self.delta_time = 0
-        self.sound = SoundController()
+        # Unsimulated time carried between frames, and how far into the next step we render
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.steps = 0
+        self.frame_input = FrameInput()
+        
+        # Game logic, stepped independently of rendering
+        with self.startup.phase("simulation"):
+            self.sim = Simulation(
+                seed=seed,
+                # Sizes in the game world, whatever resolution the sprites are drawn at
+                sprite_sizes=load_sprite_sizes(),
+                collision_mode=collision_mode,
+                swarm_profile=swarm_profile
+            )
+        
+        # Per-frame instrumentation; the null version costs next to nothing
+        self.profiler = FrameProfiler() if profile else NullProfiler()
+        self.profile_path = None
+        if self.profiler.enabled:
+            self.sim.profiler = self.profiler
+        
         # Initialize game components
         self.reset_game()
         
-    def create_stars(self) -> List[Star]:
-        stars = []
-        for _ in range(NUM_STARS):
-            speed_index = random.randint(0, len(STAR_SPEEDS) - 1)
-            stars.append(Star(
-                x=random.randint(0, WINDOW_WIDTH),
-                y=random.randint(0, WINDOW_HEIGHT),
-                speed=STAR_SPEEDS[speed_index],
-                color=STAR_COLORS[speed_index]
-            ))
-        return stars
-        
-    def update_stars(self):
-        for star in self.stars:
-            star.y += star.speed * self.delta_time
-            if star.y > WINDOW_HEIGHT:
-                star.y = 0
-                star.x = random.randint(0, WINDOW_WIDTH)
-                
-    def draw_stars(self):
-        for star in self.stars:
-            pygame.draw.circle(self.screen, star.color, (int(star.x), int(star.y)), 1)
-            
+    def ui(self, size: int) -> int:
+        """Scale a text size or layout distance given for the full-size window to the render target"""
+        return size // self.view_scale
+        
+    def draw_splash(self, loaded: int, total: int):
+        """Loading screen, redrawn while startup work runs in the background"""
+        pygame.event.pump()
+        self.screen.fill((0, 0, 0))
+        title = self.text.render("SPACE INVADERS", self.ui(74), WHITE)
+        self.screen.blit(title, title.get_rect(center=(self.view_width // 2, self.view_height // 3)))
+        bar = pygame.Rect(0, 0, self.view_width // 2, self.ui(16))
+        bar.center = (self.view_width // 2, self.view_height // 2)
+        pygame.draw.rect(self.screen, WHITE, bar, 1)
+        filled = bar.inflate(-4, -4)
+        filled.width = filled.width * loaded // max(total, 1)
+        pygame.draw.rect(self.screen, WHITE, filled)
+        self.display.flip()
+        
+    @property
+    def game_state(self) -> str:
+        return self._game_state
+    
+    @game_state.setter
+    def game_state(self, state: str):
+        if state == self._game_state:
+            return
+        self._game_state = state
+        self.needs_redraw = True
+        # Idle animation picks up from here, not from the last idle frame
+        self.last_draw = pygame.time.get_ticks()
+        if state == PLAYING:
+            # Don't count the time spent on the menu as the first frame of play
+            self.clock.tick()
+        self.set_controls_active(state == PLAYING)
+        
+    def set_controls_active(self, active: bool):
+        """Called when play starts or stops. add_controls pauses hardware polling here."""
+        self.controls_active = active
+        
+    # Game state lives in the simulation; these keep the familiar attribute names
+    @property
+    def player(self) -> Entity:
+        return self.sim.player
+        
+    @property
+    def aliens(self):
+        return self.sim.aliens
+        
+    @property
+    def bullets(self):
+        return self.sim.bullets
+        
+    @property
+    def alien_projectiles(self):
+        return self.sim.alien_projectiles
+        
+    @property
+    def score(self) -> int:
+        return self.sim.score
+        
+    @property
+    def shoot_timer(self) -> float:
+        return self.sim.shoot_timer
+        
     def reset_game(self):
-        # Initialize player at the bottom center of the screen
-        self.player = Entity(
-            WINDOW_WIDTH // 2,
-            WINDOW_HEIGHT - self.player_img.get_height(),
-            self.player_img.get_width(),
-            self.player_img.get_height()
-        )
-        self.aliens: List[Entity] = []
-        self.bullets: List[Entity] = []
-        self.alien_projectiles: List[Entity] = []
-        self.shoot_timer = 0
-        self.score = 0
-        self.spawn_aliens()
+        self.stop_recording()
+        self.sim.seed(self.game_seeds.getrandbits(32))
+        self.sim.reset()
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.session_devices = 0
+        self.last_rank = None
+        self.particles.clear()
+        if self.record_path and self.game_state == PLAYING:
+            self.start_recording()
+            
+    def start_recording(self):
+        self.games_recorded += 1
+        path = self.record_path
+        if self.games_recorded > 1:
+            stem, dot, extension = path.rpartition(".")
+            path = f"{stem}-{self.games_recorded}.{extension}" if dot else f"{path}-{self.games_recorded}"
+        self.recorder = Recorder(path, self.sim.seed_value, self.sim.swarm.profile_name)
+        
+    def stop_recording(self):
+        if self.recorder:
+            self.recorder.close(self.score)
+            self.recorder = None
 
     def handle_menu_input(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_w:
                 self.selected_option = (self.selected_option - 1) % len(self.menu_options)
+                self.needs_redraw = True
             elif event.key == pygame.K_s:
                 self.selected_option = (self.selected_option + 1) % len(self.menu_options)
+                self.needs_redraw = True
             elif event.key == pygame.K_RETURN:
                 if self.selected_option == 0:  # Start Game
                     self.game_state = PLAYING
@@ -141,215 +259,256 @@ class Game:
                     sys.exit()
 
     def draw_menu(self):
-        self.screen.fill((0, 0, 0))
-        self.draw_stars()
+        self.starfield.draw(self.screen)
         
         # Draw title
-        title_font = pygame.font.Font(None, 74)
-        title_text = title_font.render("SPACE INVADERS", True, WHITE)
-        title_rect = title_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 3))
+        title_text = self.text.render("SPACE INVADERS", self.ui(74), WHITE, font="pixel")
+        title_rect = title_text.get_rect(center=(self.view_width // 2, self.view_height // 3))
         self.screen.blit(title_text, title_rect)
         
         # Draw menu options
-        menu_font = pygame.font.Font(None, 48)
         for i, option in enumerate(self.menu_options):
             color = RED if i == self.selected_option else WHITE
-            text = menu_font.render(option, True, color)
-            rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2 + i * 60))
+            text = self.text.render(option, self.ui(48), color)
+            rect = text.get_rect(center=(self.view_width // 2, self.view_height // 2 + i * self.ui(60)))
             self.screen.blit(text, rect)
             
         # Draw instructions
-        inst_font = pygame.font.Font(None, 36)
-        inst_text = inst_font.render("Use W/S keys to select, Enter to confirm", True, WHITE)
-        inst_rect = inst_text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT * 0.8))
+        inst_text = self.text.render("Use W/S keys to select, Enter to confirm", self.ui(36), WHITE)
+        inst_rect = inst_text.get_rect(center=(self.view_width // 2, self.view_height * 0.8))
         self.screen.blit(inst_text, inst_rect)
         
-        pygame.display.flip()
+        if self.renderer:
+            self.renderer.invalidate()
+        self.display.flip()
 
-    def spawn_aliens(self):
-        self.aliens.clear()
-        
-        base_count = 10
-        extra_aliens = random.randint(1, 5)
-        total_aliens = base_count + extra_aliens
-        
-        for _ in range(total_aliens):
-            x = random.uniform(WINDOW_WIDTH * 0.1, WINDOW_WIDTH * 0.9)
-            y = random.uniform(WINDOW_HEIGHT * 0.1, WINDOW_HEIGHT * 0.4)
-            velocity_x = random.uniform(-30, 30)
-            velocity_y = random.uniform(-20, 20)
-            
-            alien = Entity(
-                x, y,
-                self.alien_img.get_width(),
-                self.alien_img.get_height(),
-                velocity_x,
-                velocity_y
-            )
-            self.aliens.append(alien)
-            
-    def handle_input(self):
+    def read_input(self) -> FrameInput:
+        """Sample the keyboard. add_controls extends this with the gyro and button."""
         keys = pygame.key.get_pressed()
+        return FrameInput(
+            left=bool(keys[pygame.K_a]),
+            right=bool(keys[pygame.K_d]),
+            fire=bool(keys[pygame.K_SPACE])
+        )
         
-        # Player movement
-        if keys[pygame.K_a]:
-            self.player.velocity_x = -PLAYER_SPEED
-        elif keys[pygame.K_d]:
-            self.player.velocity_x = PLAYER_SPEED
-        else:
-            self.player.velocity_x = 0
-            
-        # Shooting
-        if keys[pygame.K_SPACE] and self.shoot_timer <= 0:
-            self.shoot_timer = SHOOT_COOLDOWN
-            bullet = Entity(
-                self.player.x + self.player.width // 2 - self.bullet_img.get_width() // 2,
-                self.player.y,
-                self.bullet_img.get_width(),
-                self.bullet_img.get_height(),
-                0,
-                -BULLET_SPEED
-            )
-            self.bullets.append(bullet)
+    def handle_input(self):
+        self.frame_input = self.read_input()
+        self.session_devices |= input_devices(self.frame_input)
+        apply_input(self.sim, self.frame_input)
             
+    def begin_frame(self):
+        """
+        Wait out the rest of the last frame and start timing this one. Runs
+        before input is read, so the pacer's busy time includes input polling.
+        """
+        # Frames longer than MAX_FRAME_TIME slow the game down rather than
+        # running an ever-growing number of catch-up steps
+        self.delta_time = min(self.pacer.tick(self.clock), MAX_FRAME_TIME)
+        self.profiler.lap("wait")
+
     def update(self):
-        self.delta_time = self.clock.tick(60) / 1000.0
-        self.update_stars()
+        self.starfield.update(self.delta_time)
+        self.profiler.lap("stars")
         
         if self.game_state != PLAYING:
             return
             
-        # Update timers
-        self.shoot_timer -= self.delta_time
-        
-        # Update player position
-        self.player.x += self.player.velocity_x * self.delta_time
-        self.player.x = max(0, min(WINDOW_WIDTH - self.player.width, self.player.x))
-        
-        # Update bullets
-        for bullet in self.bullets[:]:
-            bullet.y += bullet.velocity_y * self.delta_time
-            if bullet.y < 0:
-                self.bullets.remove(bullet)
-                
-        # Update alien projectiles
-        for proj in self.alien_projectiles[:]:
-            proj.y += ALIEN_PROJECTILE_SPEED * self.delta_time
-            if proj.y > WINDOW_HEIGHT:
-                self.alien_projectiles.remove(proj)
-                
-            if self.check_collision(proj, self.player):
-                self.game_state = GAME_OVER
-                self.sound.play_game_over()
-                
-        # Update aliens
-        for alien in self.aliens[:]:
-            player_center_x = self.player.x + self.player.width // 2
-            player_center_y = self.player.y + self.player.height // 2
-            alien_center_x = alien.x + alien.width // 2
-            alien_center_y = alien.y + alien.height // 2
+        if self.recorder:
+            self.recorder.record(self.delta_time, self.frame_input)
             
-            dx = player_center_x - alien_center_x
-            dy = player_center_y - alien_center_y
-            distance = math.sqrt(dx * dx + dy * dy)
-            
-            if distance > 0:
-                alien.velocity_x = (dx / distance) * ALIEN_SPEED
-                alien.velocity_y = (dy / distance) * ALIEN_SPEED
-                
-            alien.x += alien.velocity_x * self.delta_time
-            alien.y += alien.velocity_y * self.delta_time
+        # Run as many fixed steps as the elapsed real time covers
+        self.accumulator += self.delta_time
+        self.steps = 0
+        while self.accumulator >= FIXED_TIMESTEP and not self.sim.game_over:
+            self.sim.step(FIXED_TIMESTEP)
+            self.accumulator -= FIXED_TIMESTEP
+            self.steps += 1
+        self.alpha = self.accumulator / FIXED_TIMESTEP
+        
+        self.handle_sim_events()
+        self.profiler.lap("events")
+        self.particles.update(self.delta_time)
+        self.profiler.lap("particles")
+        
+    def apply_quality(self):
+        """Apply the pacer's current quality level"""
+        level = self.pacer.level
+        self.starfield.visible_layers = level.star_layers
+        self.effects_enabled = level.effects
+        if not self.effects_enabled:
+            self.particles.clear()
+        if self.renderer:
+            # Stars of a hidden layer would otherwise stay on screen
+            self.renderer.invalidate()
             
-            if (alien.x < 0 or alien.x > WINDOW_WIDTH or
-                alien.y < 0 or alien.y > WINDOW_HEIGHT):
-                self.aliens.remove(alien)
-                continue
-                
-            if random.random() < SHOOT_CHANCE:
-                projectile = Entity(
-                    alien.x + alien.width // 2 - self.alien_projectile_img.get_width() // 2,
-                    alien.y + alien.height,
-                    self.alien_projectile_img.get_width(),
-                    self.alien_projectile_img.get_height(),
-                    0,
-                    0
-                )
-                self.alien_projectiles.append(projectile)
-                
-            if self.check_collision(alien, self.player):
+    def handle_sim_events(self):
+        """React to everything the simulation reported since the last frame"""
+        effects = self.effects_enabled
+        for kind, x, y in self.sim.events:
+            if kind == SHOOT:
+                self.sound.play_shoot()
+                if effects:
+                    self.particles.emit(x + self.sim.sprite_sizes["bullet"][0] / 2, y,
+                                        BURSTS["muzzle_flash"])
+            elif kind == EXPLOSION:
+                self.sound.play_explosion()
+                if effects:
+                    self.particles.emit(x, y, BURSTS["explosion"])
+            elif kind == PLAYER_DIED:
+                if effects:
+                    self.particles.emit(x + self.player.width / 2, y + self.player.height / 2,
+                                        BURSTS["player_died"])
                 self.game_state = GAME_OVER
                 self.sound.play_game_over()
-                
-        # Check bullet collisions with aliens
-        for bullet in self.bullets[:]:
-            for alien in self.aliens[:]:
-                if self.check_collision(bullet, alien):
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
-                    if alien in self.aliens:
-                        self.aliens.remove(alien)
-                        self.score += 1
-                        self.sound.play_explosion()
-                        break
-                        
-        if not self.aliens:
-            self.spawn_aliens()
-            
-    def check_collision(self, entity1: Entity, entity2: Entity) -> bool:
-        center1_x = entity1.x + entity1.width // 2
-        center1_y = entity1.y + entity1.height // 2
-        center2_x = entity2.x + entity2.width // 2
-        center2_y = entity2.y + entity2.height // 2
+                self.stop_recording()
+                self.save_session()
+        self.sim.events.clear()
+        # Start the frame's sounds together, however many events asked for them
+        self.sound.flush()
         
-        dx = center1_x - center2_x
-        dy = center1_y - center2_y
-        distance = math.sqrt(dx * dx + dy * dy)
-        return distance < COLLISION_RADIUS
+    def save_session(self):
+        """Add the finished game to the high scores; the file write happens off this thread"""
+        self.last_rank = self.highscores.submit(Session(
+            score=self.score,
+            duration=self.sim.time,
+            wave=self.sim.wave,
+            devices=self.session_devices
+        ))
         
     def draw_game(self):
-        self.screen.fill((0, 0, 0))
-        self.draw_stars()
-        
-        # Draw game elements
-        self.screen.blit(self.player_img, (self.player.x, self.player.y))
+        drawn = self.draw_scene()
+        if self.renderer:
+            self.renderer.present(drawn)
+        else:
+            self.display.flip()
+
+    def draw_scene(self) -> List[pygame.Rect]:
+        """
+        Draw the game without presenting it.
+
+        Returns:
+            list: Rectangles drawn on, when dirty-rect rendering is on
+        """
+        if self.renderer:
+            self.renderer.begin_frame()
+            drawn = self.starfield.draw_stars(self.screen)
+        else:
+            self.starfield.draw(self.screen)
+            drawn = []
         
-        for alien in self.aliens:
-            self.screen.blit(self.alien_img, (alien.x, alien.y))
+        # Draw game elements part-way between the last two simulation steps
+        player_x = self.sim.player_prev_x + (self.player.x - self.sim.player_prev_x) * self.alpha
+        drawn.append(self.screen.blit(self.player_img, (player_x / self.view_scale,
+                                                        self.player.y / self.view_scale)))
         
-        for bullet in self.bullets:
-            self.screen.blit(self.bullet_img, (bullet.x, bullet.y))
+        self.blit_all(self.alien_img, self.aliens.interpolated_positions(self.alpha), drawn)
+        self.blit_all(self.bullet_img, self.bullets.interpolated_positions(self.alpha), drawn)
+        self.blit_all(self.alien_projectile_img,
+                      self.alien_projectiles.interpolated_positions(self.alpha), drawn)
         
-        for proj in self.alien_projectiles:
-            self.screen.blit(self.alien_projectile_img, (proj.x, proj.y))
+        self.profiler.lap("draw")
+        drawn.extend(self.particles.draw(self.screen, dirty=self.renderer is not None,
+                                         scale=self.view_scale))
+        self.profiler.lap("particles")
         
-        # Draw score
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 10))
+        # Draw score, re-rendering it only when it changes
+        if self.score != self.score_text_value:
+            self.score_text_value = self.score
+            self.score_text = self.text.font("default", self.ui(36)).render(
+                f"Score: {self.score}", True, WHITE)
+        drawn.append(self.screen.blit(self.score_text, (self.ui(10), self.ui(10))))
         
-        pygame.display.flip()
+        overlay = self.profiler.draw_overlay(self.screen)
+        if overlay:
+            drawn.append(overlay)
+        return drawn
 
+    def blit_all(self, image: pygame.Surface, positions, drawn: List[pygame.Rect]):
+        """
+        Draw one sprite at many positions with a single Surface.blits call.
+        
+        Args:
+            image: Sprite to draw
+            positions: (n, 2) array of top-left positions in the game world
+            drawn: List that receives the drawn rectangles when dirty-rect rendering is on
+        """
+        if self.view_scale != 1:
+            positions = positions / self.view_scale
+        sequence = zip(repeat(image), positions.tolist())
+        if self.renderer:
+            drawn.extend(self.screen.blits(sequence))
+        else:
+            self.screen.blits(sequence, doreturn=False)
+            
     def draw_game_over(self):
-        # Keep the game screen visible but add overlay
-        font = pygame.font.Font(None, 74)
-        game_over_text = font.render("Game Over!", True, RED)
-        score_text = font.render(f"Final Score: {self.score}", True, WHITE)
-        restart_text = font.render("Press SPACE for Menu", True, WHITE)
+        # Keep the game screen visible, with the death burst still playing out, and add overlay
+        self.draw_scene()
+        game_over_text = self.text.render("Game Over!", self.ui(74), RED)
+        score_text = self.text.render(f"Final Score: {self.score}", self.ui(74), WHITE)
+        restart_text = self.text.render("Press SPACE for Menu", self.ui(74), WHITE)
+        if self.last_rank:
+            rank_text = self.text.render(f"New high score! #{self.last_rank}", self.ui(36), RED)
+        else:
+            rank_text = self.text.render(f"High score: {self.highscores.best}", self.ui(36), WHITE)
         
         self.screen.blit(game_over_text,
-                       (WINDOW_WIDTH//2 - game_over_text.get_width()//2,
-                        WINDOW_HEIGHT//2 - 100))
+                       (self.view_width//2 - game_over_text.get_width()//2,
+                        self.view_height//2 - self.ui(100)))
         self.screen.blit(score_text,
-                       (WINDOW_WIDTH//2 - score_text.get_width()//2,
-                        WINDOW_HEIGHT//2))
+                       (self.view_width//2 - score_text.get_width()//2,
+                        self.view_height//2))
         self.screen.blit(restart_text,
-                       (WINDOW_WIDTH//2 - restart_text.get_width()//2,
-                        WINDOW_HEIGHT//2 + 100))
+                       (self.view_width//2 - restart_text.get_width()//2,
+                        self.view_height//2 + self.ui(100)))
+        self.screen.blit(rank_text,
+                       (self.view_width//2 - rank_text.get_width()//2,
+                        self.view_height//2 + self.ui(170)))
         
-        pygame.display.flip()
+        if self.renderer:
+            self.renderer.invalidate()
+        self.display.flip()
+
+    def wait_for_events(self) -> List[pygame.event.Event]:
+        """
+        Poll for events during play. Otherwise sleep until an event arrives or
+        the next idle redraw is due, so menus cost next to nothing.
+        """
+        if self.game_state == PLAYING or self.needs_redraw:
+            return pygame.event.get()
+        fps = self.idle_fps()
+        if fps:
+            timeout = int(self.last_draw + 1000 / fps - pygame.time.get_ticks())
+            if timeout <= 0:
+                return pygame.event.get()
+            first = pygame.event.wait(timeout)
+        else:
+            first = pygame.event.wait()
+        events = pygame.event.get()
+        if first.type != pygame.NOEVENT:
+            events.insert(0, first)
+        return events
         
-    # [Previous code remains the same until the draw function]
+    def idle_fps(self) -> int:
+        """Redraw rate outside of play; game over runs at full rate until the death burst fades"""
+        if self.game_state == GAME_OVER and self.particles.longest > 0:
+            return self.pacer.target_fps
+        return IDLE_FPS[self.game_state]
 
+    def update_idle(self):
+        """Redraw a menu or game over screen if it changed or its next frame is due"""
+        now = pygame.time.get_ticks()
+        fps = self.idle_fps()
+        due = fps and now - self.last_draw >= 1000 / fps
+        if not (due or self.needs_redraw):
+            return
+        elapsed = min((now - self.last_draw) / 1000.0, MAX_FRAME_TIME)
+        self.starfield.update(elapsed)
+        if self.game_state == GAME_OVER:
+            self.particles.update(elapsed)
+        self.last_draw = now
+        self.needs_redraw = False
+        self.draw()
+        
     def draw(self):
         if self.game_state == MENU:
             self.draw_menu()
@@ -359,26 +518,101 @@ class Game:
             self.draw_game_over()
         
     def run(self):
+        # Everything up to the first frame counts as startup
+        self.startup.finish()
         running = True
+        collision_tests = self.sim.collision_tests
         while running:
-            for event in pygame.event.get():
+            self.profiler.begin_frame()
+            for event in self.wait_for_events():
                 if event.type == pygame.QUIT:
                     running = False
                     
+                if event.type == pygame.VIDEOEXPOSE:
+                    self.needs_redraw = True
+                    
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    self.profiler.show_overlay = not self.profiler.show_overlay
+                    
                 if self.game_state == MENU:
                     self.handle_menu_input(event)
                 elif self.game_state == GAME_OVER:
                     if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
                         self.game_state = MENU
             
-            self.handle_input()
-            self.update()
-            self.draw()
+            if self.game_state == PLAYING:
+                self.begin_frame()
+                self.handle_input()
+                self.profiler.lap("input")
+                self.update()
+                self.profiler.lap("events")
+                self.draw()
+                self.profiler.lap("draw")
+                if self.pacer.end_frame():
+                    self.apply_quality()
+            else:
+                self.profiler.lap("wait")
+                self.update_idle()
+                self.profiler.lap("draw")
+            self.profiler.end_frame(
+                aliens=len(self.aliens),
+                bullets=len(self.bullets),
+                projectiles=len(self.alien_projectiles),
+                collision_tests=self.sim.collision_tests - collision_tests,
+                steps=self.steps,
+                particles=self.particles.drawn
+            )
+            collision_tests = self.sim.collision_tests
             
+        self.stop_recording()
+        self.highscores.close()
+        if self.profile_path:
+            self.profiler.export(self.profile_path)
         pygame.quit()
         sys.exit()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Space Invaders")
+    parser.add_argument("--seed", type=int, default=None, help="seed for all game randomness")
+    parser.add_argument("--collision-mode", default=COLLISION_MODE,
+                        choices=["hash", "brute", "verify"])
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="update only the changed parts of the screen during play")
+    parser.add_argument("--stars", type=int, default=NUM_STARS, help="number of background stars")
+    parser.add_argument("--profile", metavar="FILE", default=None,
+                        help="record per-frame timings (F3 toggles the overlay) and write them "
+                             "to a .csv or .json file on exit")
+    parser.add_argument("--cprofile", metavar="FILE", default=None,
+                        help="run the session under cProfile and write the stats to FILE")
+    parser.add_argument("--record", metavar="FILE", default=None,
+                        help="record each game for replay.py (later games get -2, -3, ... suffixes)")
+    parser.add_argument("--no-sound", action="store_true", help="run without audio")
+    parser.add_argument("--scores", metavar="FILE", default=SCORES_PATH,
+                        help="high score log (see highscores.py)")
+    parser.add_argument("--render-scale", type=int, default=1, choices=RENDER_SCALES,
+                        help="draw at 1/N of the window resolution and scale up; 2 draws the "
+                             "sprites at their source size")
+    parser.add_argument("--window", type=parse_size, default=None, metavar="WxH",
+                        help="window size (default: 800x600)")
+    parser.add_argument("--present", default=SCALED, choices=[SCALED, BLIT],
+                        help="scale up with SDL's SCALED mode or a software blit")
+    parser.add_argument("--fullscreen", action="store_true", help="fill the screen")
+    parser.add_argument("--swarm", default=SWARM_PROFILE, choices=["homing", "flow"],
+                        help="alien steering profile")
+    parser.add_argument("--fps", type=int, default=60, help="target frame rate")
+    parser.add_argument("--quality", default=None, choices=[level.name for level in QUALITY_LEVELS],
+                        help="fix the quality level instead of scaling it to hold the frame rate")
+    args = parser.parse_args()
+    
     Game = add_controls(Game)  # Apply gyro controls
-    game = Game()
-    game.run()
\ No newline at end of file
+    game = Game(seed=args.seed, collision_mode=args.collision_mode, dirty_rects=args.dirty_rects,
+                num_stars=args.stars, profile=args.profile is not None,
+                record_path=args.record, sound=not args.no_sound, swarm_profile=args.swarm,
+                target_fps=args.fps, quality=args.quality, scores_path=args.scores,
+                render_scale=args.render_scale, window=args.window, present=args.present,
+                fullscreen=args.fullscreen)
+    game.profile_path = args.profile
+    if args.cprofile:
+        profile_session(game.run, args.cprofile)
+    else:
+        game.run()
\ No newline at end of file
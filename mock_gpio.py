@@ -0,0 +1,106 @@
+import threading
+from typing import Callable, Dict, Optional
+
+# Constants mirroring RPi.GPIO
+BCM = 11
+BOARD = 10
+IN = 1
+OUT = 0
+HIGH = 1
+LOW = 0
+PUD_OFF = 20
+PUD_DOWN = 21
+PUD_UP = 22
+RISING = 31
+FALLING = 32
+BOTH = 33
+
+
+class MockGPIO:
+    """
+    In-memory stand-in for the parts of RPi.GPIO the game uses.
+
+    Pins are driven from code with press()/release() (or set_level()), which
+    update what input() reports and fire any registered edge callbacks, so
+    button handling can be exercised on a normal Linux box.
+    """
+
+    BCM = BCM
+    BOARD = BOARD
+    IN = IN
+    OUT = OUT
+    HIGH = HIGH
+    LOW = LOW
+    PUD_OFF = PUD_OFF
+    PUD_DOWN = PUD_DOWN
+    PUD_UP = PUD_UP
+    RISING = RISING
+    FALLING = FALLING
+    BOTH = BOTH
+
+    def __init__(self):
+        self.mode: Optional[int] = None
+        self.levels: Dict[int, int] = {}
+        self.edge_detect: Dict[int, tuple] = {}
+        self._lock = threading.Lock()
+
+    def setmode(self, mode: int):
+        self.mode = mode
+
+    def setwarnings(self, flag: bool):
+        pass
+
+    def setup(self, pin: int, direction: int, pull_up_down: int = PUD_OFF):
+        # A pulled-up input idles high, a pulled-down one idles low
+        self.levels[pin] = HIGH if pull_up_down == PUD_UP else LOW
+
+    def input(self, pin: int) -> int:
+        return self.levels[pin]
+
+    def add_event_detect(self, pin: int, edge: int, callback: Optional[Callable[[int], None]] = None,
+                         bouncetime: Optional[int] = None):
+        if pin not in self.levels:
+            raise RuntimeError("You must setup() the GPIO channel first")
+        self.edge_detect[pin] = (edge, [callback] if callback else [])
+
+    def add_event_callback(self, pin: int, callback: Callable[[int], None]):
+        self.edge_detect[pin][1].append(callback)
+
+    def remove_event_detect(self, pin: int):
+        self.edge_detect.pop(pin, None)
+
+    def cleanup(self, pin: Optional[int] = None):
+        if pin is None:
+            self.levels.clear()
+            self.edge_detect.clear()
+        else:
+            self.levels.pop(pin, None)
+            self.edge_detect.pop(pin, None)
+
+    def set_level(self, pin: int, level: int):
+        """Drive a pin to a level, firing edge callbacks on a change"""
+        with self._lock:
+            previous = self.levels[pin]
+            self.levels[pin] = level
+        if previous == level or pin not in self.edge_detect:
+            return
+        edge, callbacks = self.edge_detect[pin]
+        falling = level == LOW
+        if edge == BOTH or (edge == FALLING and falling) or (edge == RISING and not falling):
+            for callback in list(callbacks):
+                callback(pin)
+
+    def press(self, pin: int):
+        """Simulate pressing a button wired to ground with a pull-up"""
+        self.set_level(pin, LOW)
+
+    def release(self, pin: int):
+        self.set_level(pin, HIGH)
+
+    def tap(self, pin: int, bounces: int = 0):
+        """Press and release a button, optionally with contact bounce"""
+        for _ in range(bounces):
+            self.press(pin)
+            self.release(pin)
+        self.press(pin)
+        self.release(pin)
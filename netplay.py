@@ -0,0 +1,646 @@
+"""
+Networked matches: an authoritative asyncio server, player and spectator
+clients, and a load test.
+
+The server runs one headless Simulation per connected player, all started
+from the same seed, and steps them on a fixed timestep with the latest input
+each player sent. Every few ticks it sends each client a snapshot of every
+board, delta-compressed against the last snapshot that client acknowledged:
+entity positions are sent as offsets from the same entity in that snapshot.
+Clients render slightly in the past, interpolating between snapshots.
+
+    python netplay.py server --port 7777 --seed 42
+    python netplay.py play localhost:7777
+    python netplay.py watch localhost:7777
+    python netplay.py loadtest --clients 16 --seconds 10
+"""
+import argparse
+import asyncio
+import random
+import struct
+import time
+import zlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional, Tuple
+import numpy as np
+from constants import FIXED_TIMESTEP
+from input_state import FrameInput, apply_input
+from replay import FRAME, pack_frame, unpack_frame
+from simulation import Simulation, load_sprite_sizes
+
+DEFAULT_PORT = 7777
+SNAPSHOT_INTERVAL = 3           # Ticks between snapshots: 20 Hz at the 60 Hz tick rate
+HISTORY = 64                    # Snapshots kept per client as possible delta bases
+POSITION_SCALE = 4              # Positions are sent as int16 quarter pixels
+INTERPOLATION_DELAY = 0.1       # Seconds clients render behind the newest snapshot
+MAX_WRITE_BUFFER = 64 * 1024    # Bytes queued to a client above which its snapshots are skipped
+MAX_SKIPPED = 100               # Snapshots skipped in a row before a client is disconnected
+
+# Message types
+HELLO = 1
+WELCOME = 2
+INPUT = 3
+SNAPSHOT = 4
+ACK = 5
+
+# Client roles
+PLAYER = 0
+SPECTATOR = 1
+
+MESSAGE = struct.Struct("<IB")              # payload length, message type
+HELLO_MSG = struct.Struct("<B")             # role
+WELCOME_MSG = struct.Struct("<iQdI")        # player id (-1 for spectators), seed, timestep, snapshot interval
+SNAPSHOT_HEADER = struct.Struct("<IIdI")    # tick, base tick, server send time, uncompressed size
+ACK_MSG = struct.Struct("<I")               # tick
+BOARD_HEADER = struct.Struct("<iiBhhHHH")   # player id, score, game over, player x, y, entity counts
+NO_BASE = 0xFFFFFFFF                        # Base tick of a snapshot sent in full
+# Payload size of each message a client may send; anything else is malformed
+CLIENT_MESSAGE_SIZES = {HELLO: HELLO_MSG.size, INPUT: FRAME.size, ACK: ACK_MSG.size}
+# Longest payload the server reads from a client before giving up on the connection
+MAX_CLIENT_MESSAGE = max(CLIENT_MESSAGE_SIZES.values())
+
+
+def send_message(writer: asyncio.StreamWriter, kind: int, payload: bytes = b"") -> int:
+    """Queue one framed message. Returns the bytes written."""
+    data = MESSAGE.pack(len(payload), kind) + payload
+    writer.write(data)
+    return len(data)
+
+
+async def read_message(reader: asyncio.StreamReader,
+                       max_length: Optional[int] = None) -> Tuple[int, bytes]:
+    """
+    Read one framed message.
+
+    Args:
+        reader: Stream to read from
+        max_length: Longest payload accepted; a longer one raises ConnectionError
+            before any of it is buffered
+
+    Returns:
+        Tuple of the message type and its payload
+    """
+    length, kind = MESSAGE.unpack(await reader.readexactly(MESSAGE.size))
+    if max_length is not None and length > max_length:
+        raise ConnectionError(f"Message of {length} bytes is over the {max_length} byte limit")
+    return kind, await reader.readexactly(length)
+
+
+@dataclass
+class Board:
+    """One player's game as seen by a client"""
+    player_id: int
+    score: int
+    game_over: bool
+    player: np.ndarray              # (2,) top-left position
+    aliens: np.ndarray              # (n, 2) top-left positions
+    bullets: np.ndarray
+    alien_projectiles: np.ndarray
+
+
+def _quantize(x: np.ndarray, y: np.ndarray) -> bytes:
+    return np.round(np.column_stack((x, y)) * POSITION_SCALE).astype("<i2").tobytes()
+
+
+def encode_state(boards: List[Tuple[int, Simulation]]) -> bytes:
+    """Serialize every board. Entity order is stable between ticks, which keeps deltas small."""
+    parts = [struct.pack("<H", len(boards))]
+    for player_id, sim in boards:
+        parts.append(BOARD_HEADER.pack(
+            player_id, sim.score, sim.game_over,
+            int(round(sim.player.x * POSITION_SCALE)), int(round(sim.player.y * POSITION_SCALE)),
+            len(sim.aliens), len(sim.bullets), len(sim.alien_projectiles)))
+        for store in (sim.aliens, sim.bullets, sim.alien_projectiles):
+            parts.append(_quantize(store.x, store.y))
+    return b"".join(parts)
+
+
+def decode_state(data: bytes) -> List[Board]:
+    (count,) = struct.unpack_from("<H", data)
+    offset = 2
+    boards = []
+    for _ in range(count):
+        player_id, score, game_over, px, py, *counts = BOARD_HEADER.unpack_from(data, offset)
+        offset += BOARD_HEADER.size
+        groups = []
+        for n in counts:
+            positions = np.frombuffer(data, dtype="<i2", count=n * 2, offset=offset)
+            groups.append(positions.reshape(n, 2).astype(np.float64) / POSITION_SCALE)
+            offset += n * 4
+        boards.append(Board(player_id, score, bool(game_over),
+                            np.array([px, py], dtype=np.float64) / POSITION_SCALE, *groups))
+    return boards
+
+
+def _position_groups(data: bytes) -> Dict[int, List[Tuple[int, int]]]:
+    """Byte offset and entity count of each board's position groups, by player id"""
+    (count,) = struct.unpack_from("<H", data)
+    offset = 2
+    boards = {}
+    for _ in range(count):
+        player_id, *_, aliens, bullets, projectiles = BOARD_HEADER.unpack_from(data, offset)
+        offset += BOARD_HEADER.size
+        groups = []
+        for n in (aliens, bullets, projectiles):
+            groups.append((offset, n))
+            offset += n * 4
+        boards[player_id] = groups
+    return boards
+
+
+def _apply_delta(data: bytes, base: bytes, op) -> bytes:
+    # Headers are left as they are, so the layout can be read from either side of the delta
+    result = bytearray(data)
+    base_groups = _position_groups(base)
+    for player_id, groups in _position_groups(data).items():
+        for (offset, n), (base_offset, m) in zip(groups, base_groups.get(player_id, ())):
+            shared = min(n, m) * 2
+            if shared:
+                positions = np.frombuffer(result, dtype="<i2", count=shared, offset=offset)
+                op(positions, np.frombuffer(base, dtype="<i2", count=shared, offset=base_offset),
+                   out=positions)
+    return bytes(result)
+
+
+def delta_encode(state: bytes, base: bytes) -> bytes:
+    """
+    Replace every entity position in an encoded state with its offset from the same
+    entity of the same board in base. Entities keep their order between ticks, so
+    most offsets are a few quarter pixels of movement, which compress far better
+    than the positions themselves. Arithmetic wraps at 16 bits, so any offset
+    round-trips exactly.
+    """
+    return _apply_delta(state, base, np.subtract)
+
+
+def delta_decode(delta: bytes, base: bytes) -> bytes:
+    """Undo delta_encode, given the same base"""
+    return _apply_delta(delta, base, np.add)
+
+
+class ClientConnection:
+    """Server-side state for one connected client"""
+
+    def __init__(self, writer: asyncio.StreamWriter, role: int, player_id: int):
+        self.writer = writer
+        self.role = role
+        self.player_id = player_id
+        self.input = FrameInput()
+        # Sent snapshots by tick, oldest first, until acknowledged or too old
+        self.history: "OrderedDict[int, bytes]" = OrderedDict()
+        self.acked: Optional[int] = None
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.full_snapshots = 0
+        self.delta_snapshots = 0
+        # Snapshots not sent because the client wasn't reading them fast enough,
+        # in total and since the last one it was sent
+        self.skipped_snapshots = 0
+        self.skipped_in_a_row = 0
+
+    def acknowledge(self, tick: int):
+        if tick in self.history and (self.acked is None or tick > self.acked):
+            self.acked = tick
+            # Older snapshots can never be a base again
+            while next(iter(self.history)) < tick:
+                self.history.popitem(last=False)
+
+
+class MatchServer:
+    """
+    Authoritative match server. Each player's board is a Simulation stepped
+    here; clients only send input and receive snapshots.
+    """
+
+    def __init__(self, seed: Optional[int] = None, host: str = "127.0.0.1",
+                 port: int = DEFAULT_PORT, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        """
+        Initialize the server.
+
+        Args:
+            seed: Seed every player's game starts from; random if None
+            host, port: Address to listen on; port 0 picks a free one
+            snapshot_interval: Ticks between snapshots
+        """
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.host = host
+        self.port = port
+        self.snapshot_interval = snapshot_interval
+        self.sprite_sizes = load_sprite_sizes()
+        self.boards: Dict[int, Simulation] = {}
+        self.clients: List[ClientConnection] = []
+        self.next_player_id = 0
+        self.tick = 0
+        # Seconds of work per tick, and how late each tick started
+        self.tick_times: Deque[float] = deque(maxlen=3600)
+        self.tick_lateness: Deque[float] = deque(maxlen=3600)
+        self._server = None
+        self._task = None
+        self._handlers = set()
+
+    async def start(self):
+        self._server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._task = asyncio.create_task(self.run())
+        print(f"Match server on {self.host}:{self.port}, seed {self.seed}")
+
+    async def stop(self):
+        self._task.cancel()
+        self._server.close()
+        for client in self.clients:
+            client.writer.close()
+        # Closing the connections ends their handlers; let them finish cleanly
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._handlers.add(asyncio.current_task())
+        client = None
+        try:
+            kind, payload = await read_message(reader, MAX_CLIENT_MESSAGE)
+            if kind != HELLO or len(payload) != CLIENT_MESSAGE_SIZES[HELLO]:
+                print("Rejected a client: no valid hello")
+                return
+            (role,) = HELLO_MSG.unpack(payload)
+            if role not in (PLAYER, SPECTATOR):
+                print(f"Rejected a client: unknown role {role}")
+                return
+
+            player_id = -1
+            if role == PLAYER:
+                player_id = self.next_player_id
+                self.next_player_id += 1
+                self.boards[player_id] = Simulation(seed=self.seed, sprite_sizes=self.sprite_sizes)
+            client = ClientConnection(writer, role, player_id)
+            self.clients.append(client)
+            client.bytes_sent += send_message(writer, WELCOME, WELCOME_MSG.pack(
+                player_id, self.seed, FIXED_TIMESTEP, self.snapshot_interval))
+            while True:
+                kind, payload = await read_message(reader, MAX_CLIENT_MESSAGE)
+                client.bytes_received += MESSAGE.size + len(payload)
+                if len(payload) != CLIENT_MESSAGE_SIZES.get(kind, len(payload)):
+                    print(f"Dropping client {player_id}: malformed message of type {kind}")
+                    return
+                if kind == INPUT and role == PLAYER:
+                    _, frame_input = unpack_frame(payload)
+                    # Presses between ticks add up rather than overwrite each other
+                    frame_input.button_presses += client.input.button_presses
+                    client.input = frame_input
+                elif kind == ACK:
+                    client.acknowledge(ACK_MSG.unpack(payload)[0])
+        except asyncio.IncompleteReadError:
+            pass
+        except ConnectionError as e:
+            print(f"Dropping a client: {e}")
+        finally:
+            if client is not None:
+                self.clients.remove(client)
+                self.boards.pop(client.player_id, None)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    async def run(self):
+        """Step every board at the fixed timestep and send snapshots"""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            started = time.perf_counter()
+            self.tick_lateness.append(max(0.0, loop.time() - next_tick))
+            for client in self.clients:
+                sim = self.boards.get(client.player_id)
+                if sim is None or sim.game_over:
+                    continue
+                apply_input(sim, client.input)
+                client.input.button_presses = 0
+                sim.step(FIXED_TIMESTEP)
+                sim.events.clear()
+            self.tick += 1
+            if self.tick % self.snapshot_interval == 0:
+                self.broadcast()
+            self.tick_times.append(time.perf_counter() - started)
+
+            next_tick += FIXED_TIMESTEP
+            delay = next_tick - loop.time()
+            if delay < 0:
+                # Fell behind; skip ahead instead of running a burst of ticks
+                next_tick = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    def broadcast(self):
+        state = encode_state(sorted(self.boards.items()))
+        sent_at = time.time()
+        # Clients that acknowledged the same tick share one compressed payload
+        payloads: Dict[int, bytes] = {}
+        for client in self.clients:
+            # A client that can't keep up would otherwise buffer snapshots without bound;
+            # it gets the next one once it catches up, as a delta if it still can be
+            if client.writer.transport.get_write_buffer_size() > MAX_WRITE_BUFFER:
+                client.skipped_snapshots += 1
+                client.skipped_in_a_row += 1
+                if client.skipped_in_a_row == MAX_SKIPPED:
+                    print(f"Disconnecting client {client.player_id}: not reading snapshots")
+                    # Closing would wait for the buffer to drain; its handler sees the
+                    # connection drop and removes it
+                    client.writer.transport.abort()
+                continue
+            client.skipped_in_a_row = 0
+            base = client.history.get(client.acked) if client.acked is not None else None
+            if base is not None:
+                base_tick = client.acked
+                client.delta_snapshots += 1
+            else:
+                base_tick = NO_BASE
+                client.full_snapshots += 1
+            payload = payloads.get(base_tick)
+            if payload is None:
+                payload = zlib.compress(state if base is None else delta_encode(state, base), 1)
+                payloads[base_tick] = payload
+            client.history[self.tick] = state
+            if len(client.history) > HISTORY:
+                client.history.popitem(last=False)
+            client.bytes_sent += send_message(
+                client.writer, SNAPSHOT,
+                SNAPSHOT_HEADER.pack(self.tick, base_tick, sent_at, len(state)) + payload)
+
+
+class MatchClient:
+    """
+    Connection to a match server. Decodes snapshots, acknowledges them and
+    interpolates between the two around the render time.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, role: int = PLAYER):
+        self.host = host
+        self.port = port
+        self.role = role
+        self.player_id = -1
+        self.timestep = FIXED_TIMESTEP
+        # Decoded snapshots as (server time, boards), oldest first
+        self.snapshots: Deque[Tuple[float, List[Board]]] = deque(maxlen=8)
+        # Raw snapshots by tick, kept as bases for the server's deltas
+        self._raw: "OrderedDict[int, bytes]" = OrderedDict()
+        # Smallest local arrival time minus server time seen, mapping server time to local time
+        self.clock_offset: Optional[float] = None
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.latencies: Deque[float] = deque(maxlen=3600)
+        self._writer = None
+        self._task = None
+
+    async def connect(self):
+        reader, self._writer = await asyncio.open_connection(self.host, self.port)
+        self.bytes_sent += send_message(self._writer, HELLO, HELLO_MSG.pack(self.role))
+        kind, payload = await read_message(reader)
+        if kind != WELCOME:
+            raise ConnectionError("Unexpected reply from server")
+        self.player_id, self.seed, self.timestep, _ = WELCOME_MSG.unpack(payload)
+        self._task = asyncio.create_task(self.receive(reader))
+
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+        if self._writer:
+            self._writer.close()
+
+    def send_input(self, frame_input: FrameInput, dt: float = 0.0):
+        """Send this frame's input, as a replay frame record"""
+        self.bytes_sent += send_message(self._writer, INPUT, pack_frame(dt, frame_input))
+
+    async def receive(self, reader: asyncio.StreamReader):
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                self.bytes_received += MESSAGE.size + len(payload)
+                if kind == SNAPSHOT:
+                    self.handle_snapshot(payload)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            print("Disconnected from server")
+
+    def handle_snapshot(self, payload: bytes):
+        tick, base_tick, sent_at, size = SNAPSHOT_HEADER.unpack_from(payload)
+        data = zlib.decompress(payload[SNAPSHOT_HEADER.size:])
+        if len(data) != size:
+            print(f"Ignoring snapshot {tick}: {len(data)} bytes, expected {size}")
+            return
+        if base_tick != NO_BASE:
+            base = self._raw.get(base_tick)
+            if base is None:
+                # The base was dropped here; the server falls back to full snapshots
+                # once acknowledgements catch up
+                return
+            data = delta_decode(data, base)
+        self._raw[tick] = data
+        while len(self._raw) > HISTORY:
+            self._raw.popitem(last=False)
+        self.bytes_sent += send_message(self._writer, ACK, ACK_MSG.pack(tick))
+
+        now = time.perf_counter()
+        self.latencies.append(time.time() - sent_at)
+        server_time = tick * self.timestep
+        offset = now - server_time
+        if self.clock_offset is None or offset < self.clock_offset:
+            self.clock_offset = offset
+        self.snapshots.append((server_time, decode_state(data)))
+
+    def interpolated(self, now: Optional[float] = None) -> List[Board]:
+        """
+        Boards as they were INTERPOLATION_DELAY ago, blended between the two
+        snapshots around that time. Entity groups whose size changed between
+        the snapshots are taken from the newer one.
+        """
+        if not self.snapshots:
+            return []
+        if now is None:
+            now = time.perf_counter()
+        render_time = now - self.clock_offset - INTERPOLATION_DELAY
+        older = newer = self.snapshots[-1]
+        for i in range(len(self.snapshots) - 1):
+            if self.snapshots[i][0] <= render_time <= self.snapshots[i + 1][0]:
+                older, newer = self.snapshots[i], self.snapshots[i + 1]
+                break
+        if older is newer:
+            return newer[1]
+        alpha = (render_time - older[0]) / (newer[0] - older[0])
+        previous = {board.player_id: board for board in older[1]}
+        boards = []
+        for board in newer[1]:
+            before = previous.get(board.player_id)
+            if before is None:
+                boards.append(board)
+                continue
+            blended = {}
+            for name in ("player", "aliens", "bullets", "alien_projectiles"):
+                a = getattr(before, name)
+                b = getattr(board, name)
+                blended[name] = a + (b - a) * alpha if a.shape == b.shape else b
+            boards.append(Board(board.player_id, board.score, board.game_over, **blended))
+        return boards
+
+
+def parse_address(address: str) -> Tuple[str, int]:
+    host, _, port = address.partition(":")
+    return host or "127.0.0.1", int(port) if port else DEFAULT_PORT
+
+
+async def run_server(host: str, port: int, seed: Optional[int]):
+    server = MatchServer(seed, host, port)
+    await server.start()
+    try:
+        while True:
+            await asyncio.sleep(5)
+            if server.tick_times:
+                print(f"tick {server.tick}: {len(server.boards)} players, "
+                      f"{len(server.clients) - len(server.boards)} spectators, "
+                      f"{np.mean(server.tick_times) * 1000:.2f} ms/tick")
+    finally:
+        await server.stop()
+
+
+async def run_viewer(host: str, port: int, role: int):
+    """Play or watch a match in a window. Spectators switch boards with Tab."""
+    import pygame
+    from constants import WINDOW_WIDTH, WINDOW_HEIGHT
+    from asset_manager import AssetManager
+    from simulation import SPRITES
+    from starfield import Starfield
+    from text_cache import TextCache
+
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption("Space Invaders - " + ("spectating" if role == SPECTATOR else "online"))
+    sprites = AssetManager().load_sprites(SPRITES)
+    starfield = Starfield(WINDOW_WIDTH, WINDOW_HEIGHT)
+    text = TextCache()
+
+    client = MatchClient(host, port, role)
+    await client.connect()
+    watching = 0
+    last = time.perf_counter()
+    try:
+        running = True
+        while running:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_TAB:
+                    watching += 1
+            now = time.perf_counter()
+            dt = now - last
+            last = now
+            if role == PLAYER:
+                keys = pygame.key.get_pressed()
+                client.send_input(FrameInput(left=bool(keys[pygame.K_a]), right=bool(keys[pygame.K_d]),
+                                             fire=bool(keys[pygame.K_SPACE])), dt)
+
+            starfield.update(dt)
+            starfield.draw(screen)
+            boards = client.interpolated(now)
+            if boards:
+                if role == PLAYER:
+                    board = next((b for b in boards if b.player_id == client.player_id), boards[0])
+                else:
+                    board = boards[watching % len(boards)]
+                screen.blit(sprites["player"], board.player.tolist())
+                for name in ("aliens", "bullets", "alien_projectiles"):
+                    image = sprites["alien" if name == "aliens" else name.rstrip("s")]
+                    screen.blits([(image, position) for position in getattr(board, name).tolist()],
+                                 doreturn=False)
+                label = f"Player {board.player_id}  Score: {board.score}"
+                if board.game_over:
+                    label += "  (game over)"
+                screen.blit(text.render(label, 36, (255, 255, 255)), (10, 10))
+            pygame.display.flip()
+            await asyncio.sleep(max(0.0, 1 / 60 - (time.perf_counter() - now)))
+    finally:
+        await client.close()
+        pygame.quit()
+
+
+async def load_test(clients: int, spectators: int, seconds: float, seed: int):
+    """
+    Run a server and simulated clients over localhost, then report bandwidth,
+    snapshot sizes, tick cost and snapshot latency. Everything shares one
+    event loop, so the numbers include the simulated clients' own overhead.
+    """
+    from batch_runner import RandomBot
+
+    server = MatchServer(seed, "127.0.0.1", 0)
+    await server.start()
+    bots = [MatchClient("127.0.0.1", server.port, PLAYER) for _ in range(clients)]
+    watchers = [MatchClient("127.0.0.1", server.port, SPECTATOR) for _ in range(spectators)]
+    await asyncio.gather(*(client.connect() for client in bots + watchers))
+    # RandomBot ignores the game state, which these clients don't have
+    policies = [RandomBot(seed + i) for i in range(clients)]
+
+    started = time.perf_counter()
+    first_tick = server.tick
+    while time.perf_counter() - started < seconds:
+        for bot, policy in zip(bots, policies):
+            bot.send_input(policy(None))
+        await asyncio.sleep(FIXED_TIMESTEP)
+    elapsed = time.perf_counter() - started
+    ticks = server.tick - first_tick
+
+    connections = list(server.clients)
+    tick_ms = np.array(server.tick_times) * 1000
+    late_ms = np.array(server.tick_lateness) * 1000
+    latency_ms = np.concatenate([np.array(c.latencies) for c in bots + watchers]) * 1000
+    sent = sum(c.bytes_sent for c in connections)
+    received = sum(c.bytes_received for c in connections)
+    full = sum(c.full_snapshots for c in connections)
+    delta = sum(c.delta_snapshots for c in connections)
+    skipped = sum(c.skipped_snapshots for c in connections)
+    raw = len(encode_state(sorted(server.boards.items())))
+
+    print(f"{clients} players + {spectators} spectators for {elapsed:.1f}s, "
+          f"{ticks} ticks ({ticks / elapsed:.1f}/s)")
+    print(f"  server out: {sent / elapsed / 1024:.1f} KiB/s total, "
+          f"{sent / elapsed / 1024 / max(1, len(connections)):.2f} KiB/s per client")
+    print(f"  server in:  {received / elapsed / 1024:.1f} KiB/s total")
+    print(f"  snapshots:  {full} full, {delta} delta, {skipped} skipped, "
+          f"{sent / max(1, full + delta):.0f} B average on the wire, {raw} B uncompressed")
+    print(f"  tick cost:  mean {tick_ms.mean():.2f} ms, p99 {np.percentile(tick_ms, 99):.2f} ms, "
+          f"max {tick_ms.max():.2f} ms; late by more than 1 ms: {(late_ms > 1).sum()} ticks")
+    if len(latency_ms):
+        print(f"  snapshot latency: mean {latency_ms.mean():.2f} ms, "
+              f"p99 {np.percentile(latency_ms, 99):.2f} ms")
+
+    await asyncio.gather(*(client.close() for client in bots + watchers))
+    await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Networked matches")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server = commands.add_parser("server", help="host a match")
+    server.add_argument("--host", default="0.0.0.0")
+    server.add_argument("--port", type=int, default=DEFAULT_PORT)
+    server.add_argument("--seed", type=int, default=None)
+    for name, help_text in (("play", "join a match as a player"), ("watch", "spectate a match")):
+        viewer = commands.add_parser(name, help=help_text)
+        viewer.add_argument("address", nargs="?", default=f"127.0.0.1:{DEFAULT_PORT}",
+                            help="HOST[:PORT]")
+    test = commands.add_parser("loadtest", help="measure the server with simulated clients")
+    test.add_argument("--clients", type=int, default=8)
+    test.add_argument("--spectators", type=int, default=0)
+    test.add_argument("--seconds", type=float, default=10.0)
+    test.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    try:
+        if args.command == "server":
+            asyncio.run(run_server(args.host, args.port, args.seed))
+        elif args.command in ("play", "watch"):
+            host, port = parse_address(args.address)
+            asyncio.run(run_viewer(host, port, PLAYER if args.command == "play" else SPECTATOR))
+        else:
+            asyncio.run(load_test(args.clients, args.spectators, args.seconds, args.seed))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+import pygame
+
+# Particles alive at once; new ones overwrite the oldest slots when full
+MAX_PARTICLES = 32768
+# Particles are drawn as squares of this many pixels
+PARTICLE_SIZE = 2
+# Downward pull, in pixels per second squared
+GRAVITY = 120.0
+# Fraction of velocity kept after one second
+DRAG = 0.3
+# Side of the tiles dirty-rect rendering is given, in pixels
+DIRTY_TILE = 64
+
+
+@dataclass
+class Burst:
+    """How one kind of event throws out particles"""
+    count: int
+    speed: Tuple[float, float]              # Minimum and maximum launch speed
+    life: Tuple[float, float]               # Minimum and maximum lifetime in seconds
+    colors: Sequence[Tuple[int, int, int]]  # Each particle picks one at random
+    direction: float = 0.0                  # Center of the launch cone, radians; 0 is right
+    spread: float = 2 * np.pi               # Width of the launch cone, radians
+
+
+BURSTS = {
+    "explosion": Burst(48, speed=(40, 220), life=(0.3, 0.9),
+                       colors=[(255, 220, 120), (255, 150, 40), (230, 60, 20), (255, 255, 255)]),
+    "muzzle_flash": Burst(8, speed=(60, 160), life=(0.06, 0.15),
+                          colors=[(255, 255, 200), (255, 220, 120)],
+                          direction=-np.pi / 2, spread=np.pi / 3),
+    "player_died": Burst(400, speed=(30, 320), life=(0.6, 1.6),
+                         colors=[(255, 255, 255), (120, 200, 255), (255, 150, 40)]),
+}
+
+
+class ParticleSystem:
+    """
+    Short-lived visual particles kept in preallocated NumPy arrays.
+
+    Emitting writes a block of slots at the ring buffer's head, overwriting
+    the oldest particles once it wraps, so there is no allocation or free
+    list. Every live particle is moved in a handful of whole-array
+    operations, and drawing writes all of them into the target surface's
+    pixels with one indexed assignment per pixel of the particle square,
+    instead of one blit each.
+    """
+
+    def __init__(self, capacity: int = MAX_PARTICLES, seed: Optional[int] = None):
+        """
+        Initialize the particle arrays.
+
+        Args:
+            capacity: Maximum particles alive at once
+            seed: Seed for particle randomness, which never affects the game itself
+        """
+        self.capacity = capacity
+        self.x = np.zeros(capacity, dtype=np.float32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.velocity_x = np.zeros(capacity, dtype=np.float32)
+        self.velocity_y = np.zeros(capacity, dtype=np.float32)
+        # Seconds left to live, and the lifetime the particle started with
+        self.life = np.zeros(capacity, dtype=np.float32)
+        self.max_life = np.ones(capacity, dtype=np.float32)
+        self.color = np.zeros((capacity, 3), dtype=np.float32)
+        self.head = 0
+        # Longest remaining lifetime; nothing is alive once this reaches 0
+        self.longest = 0.0
+        self.rng = np.random.default_rng(seed)
+        # Particles emitted in total, and drawn in the last frame
+        self.emitted = 0
+        self.drawn = 0
+
+    def __len__(self) -> int:
+        """Number of live particles"""
+        return int(np.count_nonzero(self.life > 0)) if self.longest > 0 else 0
+
+    def clear(self):
+        self.life.fill(0)
+        self.longest = 0.0
+
+    def emit(self, x: float, y: float, burst: Burst):
+        """
+        Throw out one burst of particles from a point.
+
+        Args:
+            x, y: Where the particles start
+            burst: How many, how fast, how long-lived and what colour
+        """
+        count = min(burst.count, self.capacity)
+        slots = (self.head + np.arange(count)) % self.capacity
+        self.head = (self.head + count) % self.capacity
+
+        rng = self.rng
+        angle = burst.direction + rng.uniform(-burst.spread / 2, burst.spread / 2, count)
+        speed = rng.uniform(burst.speed[0], burst.speed[1], count)
+        life = rng.uniform(burst.life[0], burst.life[1], count)
+        self.x[slots] = x
+        self.y[slots] = y
+        self.velocity_x[slots] = np.cos(angle) * speed
+        self.velocity_y[slots] = np.sin(angle) * speed
+        self.life[slots] = life
+        self.max_life[slots] = life
+        colors = np.asarray(burst.colors, dtype=np.float32)
+        self.color[slots] = colors[rng.integers(0, len(colors), count)]
+        self.longest = max(self.longest, burst.life[1])
+        self.emitted += count
+
+    def update(self, dt: float):
+        """Move every particle and age it by dt seconds"""
+        if self.longest <= 0:
+            return
+        self.longest -= dt
+        self.life -= dt
+        drag = DRAG ** dt
+        self.velocity_x *= drag
+        self.velocity_y *= drag
+        self.velocity_y += GRAVITY * dt
+        self.x += self.velocity_x * dt
+        self.y += self.velocity_y * dt
+
+    def draw(self, surface: pygame.Surface, dirty: bool = False,
+             scale: int = 1) -> List[pygame.Rect]:
+        """
+        Write every live particle into the surface's pixels, fading it out
+        over its lifetime.
+
+        Args:
+            surface: Target surface; must not be locked by anything else
+            dirty: Also work out which areas were drawn on
+            scale: Game pixels per surface pixel, for low-resolution render targets
+
+        Returns:
+            list: Tiles containing particles if dirty is set, else an empty list
+        """
+        self.drawn = 0
+        if self.longest <= 0:
+            return []
+        width, height = surface.get_size()
+        size = max(1, PARTICLE_SIZE // scale)
+        live = np.flatnonzero(self.life > 0)
+        x = (self.x[live] / scale).astype(np.int32)
+        y = (self.y[live] / scale).astype(np.int32)
+        inside = (x >= 0) & (x < width - size) & (y >= 0) & (y < height - size)
+        live, x, y = live[inside], x[inside], y[inside]
+        if len(live) == 0:
+            return []
+        fade = (self.life[live] / self.max_life[live])[:, None]
+        mapped = pygame.surfarray.map_array(surface, (self.color[live] * fade).astype(np.uint8))
+
+        pixels = pygame.surfarray.pixels2d(surface)
+        for dx in range(size):
+            for dy in range(size):
+                pixels[x + dx, y + dy] = mapped
+        # Release the surface lock before anything else draws
+        del pixels
+        self.drawn = len(live)
+
+        if not dirty:
+            return []
+        # Tiles reach a particle's size past their edge to cover particles straddling it
+        cols = -(-width // DIRTY_TILE)
+        tiles = np.unique((y // DIRTY_TILE) * cols + x // DIRTY_TILE)
+        size += DIRTY_TILE
+        return [pygame.Rect((tile % cols) * DIRTY_TILE, (tile // cols) * DIRTY_TILE, size, size)
+                for tile in tiles.tolist()]
@@ -0,0 +1,218 @@
+import cProfile
+import csv
+import json
+import time
+from typing import Callable, Dict, List, Optional
+import numpy as np
+import pygame
+
+# Timed phases of a frame, in the order they run. "wait" is time spent
+# sleeping in the frame limiter.
+PHASES = ("input", "wait", "stars", "movement", "aliens", "collisions", "events", "particles",
+          "draw")
+# Phases that together make up Game.update
+UPDATE_PHASES = ("stars", "movement", "aliens", "collisions", "events")
+# Per-frame counters
+COUNTERS = ("aliens", "bullets", "projectiles", "collision_tests", "steps", "particles")
+
+SAMPLE_DTYPE = np.dtype(
+    [("frame", np.int64), ("total_ms", np.float64)]
+    + [(f"{phase}_ms", np.float64) for phase in PHASES]
+    + [(counter, np.int64) for counter in COUNTERS]
+)
+
+
+class FrameProfiler:
+    """
+    Low-overhead per-frame instrumentation.
+
+    Code being measured calls lap(phase) at the end of each phase; the time
+    since the previous lap is charged to that phase. end_frame() stores the
+    phase times and entity/collision counters as one row of a fixed-size ring
+    buffer, so memory use stays constant however long the session runs.
+    """
+
+    enabled = True
+
+    def __init__(self, capacity: int = 600):
+        """
+        Initialize the profiler.
+
+        Args:
+            capacity: Number of most recent frames kept
+        """
+        self.samples = np.zeros(capacity, dtype=SAMPLE_DTYPE)
+        self.frames = 0
+        self.times: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.show_overlay = False
+        self._frame_start = time.perf_counter()
+        self._last = self._frame_start
+        self._overlay_font = None
+        self._overlay_lines: List[pygame.Surface] = []
+        self._overlay_updated = 0.0
+
+    def reset(self, capacity: Optional[int] = None):
+        """
+        Forget every stored frame, keeping the overlay settings.
+
+        Args:
+            capacity: New number of most recent frames kept; unchanged if None
+        """
+        if capacity is not None and capacity != len(self.samples):
+            self.samples = np.zeros(capacity, dtype=SAMPLE_DTYPE)
+        else:
+            self.samples.fill(0)
+        self.frames = 0
+        for phase in self.times:
+            self.times[phase] = 0.0
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        self._frame_start = now
+        self._last = now
+        for phase in self.times:
+            self.times[phase] = 0.0
+
+    def lap(self, phase: str):
+        """Charge the time since the previous lap to phase"""
+        now = time.perf_counter()
+        self.times[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self, **counters: int):
+        """
+        Store the finished frame.
+
+        Args:
+            counters: Values for the names in COUNTERS; missing ones are recorded as 0
+        """
+        row = self.samples[self.frames % len(self.samples)]
+        row["frame"] = self.frames
+        row["total_ms"] = (time.perf_counter() - self._frame_start) * 1000
+        for phase, seconds in self.times.items():
+            row[f"{phase}_ms"] = seconds * 1000
+        for counter in COUNTERS:
+            row[counter] = counters.get(counter, 0)
+        self.frames += 1
+
+    def recorded(self) -> np.ndarray:
+        """
+        Returns:
+            np.ndarray: The stored frames, oldest first
+        """
+        capacity = len(self.samples)
+        if self.frames <= capacity:
+            return self.samples[:self.frames].copy()
+        split = self.frames % capacity
+        return np.concatenate((self.samples[split:], self.samples[:split]))
+
+    def summary(self, last: Optional[int] = None) -> dict:
+        """
+        Average every column over the most recent frames.
+
+        Args:
+            last: Number of frames to average; all stored frames if None
+        """
+        rows = self.recorded()
+        if last is not None:
+            rows = rows[-last:]
+        if len(rows) == 0:
+            return {}
+        result = {name: float(rows[name].mean()) for name in SAMPLE_DTYPE.names if name != "frame"}
+        result["update_ms"] = sum(result[f"{phase}_ms"] for phase in UPDATE_PHASES)
+        result["max_total_ms"] = float(rows["total_ms"].max())
+        result["frames"] = len(rows)
+        return result
+
+    def export(self, path: str):
+        """Write the stored frames to a .csv or .json file, chosen by extension"""
+        rows = self.recorded()
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump({
+                    "summary": self.summary(),
+                    "frames": [dict(zip(SAMPLE_DTYPE.names, row.tolist())) for row in rows],
+                }, f, indent=2)
+        else:
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(SAMPLE_DTYPE.names)
+                writer.writerows(row.tolist() for row in rows)
+        print(f"Wrote {len(rows)} frame samples to {path}")
+
+    def draw_overlay(self, surface: pygame.Surface) -> Optional[pygame.Rect]:
+        """
+        Draw recent averages in the top-right corner.
+        The text is re-rendered twice a second to keep the overlay itself cheap.
+
+        Returns:
+            pygame.Rect: The area drawn, or None if the overlay is hidden
+        """
+        if not self.show_overlay:
+            return None
+        now = time.perf_counter()
+        if now - self._overlay_updated > 0.5:
+            self._overlay_updated = now
+            if self._overlay_font is None:
+                self._overlay_font = pygame.font.Font(None, 22)
+            stats = self.summary(last=60)
+            busy = stats.get('total_ms', 0) - stats.get('wait_ms', 0)
+            lines = [
+                f"frame {busy:.2f} ms busy (max frame {stats.get('max_total_ms', 0):.2f})",
+                f"input {stats.get('input_ms', 0):.2f}  update {stats.get('update_ms', 0):.2f}"
+                f"  draw {stats.get('draw_ms', 0):.2f}",
+                f"aliens {stats.get('aliens', 0):.0f}  bullets {stats.get('bullets', 0):.0f}"
+                f"  proj {stats.get('projectiles', 0):.0f}",
+                f"collision tests {stats.get('collision_tests', 0):.0f}",
+                f"particles {stats.get('particles', 0):.0f}  {stats.get('particles_ms', 0):.2f} ms",
+            ]
+            self._overlay_lines = [self._overlay_font.render(line, True, (255, 255, 0))
+                                   for line in lines]
+
+        width = max((line.get_width() for line in self._overlay_lines), default=0)
+        x = surface.get_width() - width - 10
+        y = 10
+        area = pygame.Rect(x, y, width, 0)
+        for line in self._overlay_lines:
+            area.union_ip(surface.blit(line, (x, y)))
+            y += line.get_height()
+        return area
+
+
+class NullProfiler:
+    """Drop-in replacement for FrameProfiler that records nothing"""
+
+    enabled = False
+    show_overlay = False
+    frames = 0
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, phase: str):
+        pass
+
+    def end_frame(self, **counters: int):
+        pass
+
+    def draw_overlay(self, surface: pygame.Surface) -> None:
+        return None
+
+    def export(self, path: str):
+        pass
+
+
+def profile_session(func: Callable[[], None], path: str):
+    """
+    Run func under cProfile and write the stats to path, even if func exits the process.
+
+    Args:
+        func: Function to profile, typically Game.run
+        path: Output file, readable with pstats or snakeviz
+    """
+    profile = cProfile.Profile()
+    try:
+        profile.runcall(func)
+    finally:
+        profile.dump_stats(path)
+        print(f"Wrote cProfile stats to {path}")
@@ -0,0 +1,123 @@
+from typing import Iterable, Optional, Tuple
+import pygame
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT
+
+# How a low-resolution frame reaches a bigger window
+SCALED = "scaled"   # SDL's SCALED display mode: the GPU scales, where there is one
+BLIT = "blit"       # One integer-scale software blit per frame into the window
+
+# Internal resolutions offered, as the factor the game world is divided by.
+# 2 draws the sprites at their source size, the pixel art's native resolution.
+RENDER_SCALES = (1, 2)
+
+
+def parse_size(text: str) -> Tuple[int, int]:
+    """Parse WIDTHxHEIGHT"""
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+class RenderTarget:
+    """
+    The surface the game draws on, and how it is shown.
+
+    The game world is always WINDOW_WIDTH x WINDOW_HEIGHT. At render scale 1
+    the window shows it pixel for pixel, as the game always has. At a higher
+    scale everything is drawn to a surface that much smaller, which holds the
+    sprites at their source size, and then presented scaled up to the window,
+    so the CPU only touches the pixels the art actually has.
+
+    flip() and update() stand in for pygame.display's, so callers present
+    frames the same way whichever mode is in use.
+    """
+
+    def __init__(self, render_scale: int = 1, window: Optional[Tuple[int, int]] = None,
+                 present: str = SCALED, fullscreen: bool = False):
+        """
+        Open the window.
+
+        Args:
+            render_scale: Factor the world is divided by to get the drawing resolution
+            window: Window size; the world size if None, the desktop if fullscreen
+            present: SCALED or BLIT, used when the window isn't the drawing resolution
+            fullscreen: Fill the screen, keeping square pixels
+        """
+        self.render_scale = render_scale
+        self.resolution = (WINDOW_WIDTH // render_scale, WINDOW_HEIGHT // render_scale)
+        if window is None and not fullscreen:
+            window = (WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.window = None
+        self.present_mode = None
+
+        if window == self.resolution and not fullscreen:
+            # Drawing straight to the window
+            self.surface = pygame.display.set_mode(self.resolution)
+        else:
+            if present == SCALED:
+                try:
+                    flags = pygame.SCALED | (pygame.FULLSCREEN if fullscreen else 0)
+                    self.surface = pygame.display.set_mode(self.resolution, flags)
+                    self.present_mode = SCALED
+                    if window and not fullscreen:
+                        self._resize_window(window)
+                except pygame.error as e:
+                    print(f"SCALED display mode unavailable: {e}")
+                    print("Falling back to blit scaling")
+            if self.present_mode is None:
+                self._open_blit(window, fullscreen)
+        print(f"Rendering at {self.resolution[0]}x{self.resolution[1]}"
+              + (f", presented with {self.present_mode}" if self.present_mode else ""))
+
+    def _open_blit(self, window: Optional[Tuple[int, int]], fullscreen: bool):
+        self.window = pygame.display.set_mode(window or (0, 0),
+                                              pygame.FULLSCREEN if fullscreen else 0)
+        self.surface = pygame.Surface(self.resolution).convert()
+        self.present_mode = BLIT
+        # Largest whole multiple that fits, centred with black borders
+        width, height = self.window.get_size()
+        self.factor = max(1, min(width // self.resolution[0], height // self.resolution[1]))
+        self.area = pygame.Rect(0, 0, self.resolution[0] * self.factor,
+                                self.resolution[1] * self.factor)
+        self.area.center = (width // 2, height // 2)
+        self.area = self.area.clip(self.window.get_rect())
+        self.scaled = self.window.subsurface(self.area)
+
+    @staticmethod
+    def _resize_window(size: Tuple[int, int]):
+        """SCALED windows open at a size SDL picks; ask for the configured one"""
+        try:
+            from pygame._sdl2.video import Window
+            Window.from_display_module().size = size
+        except (ImportError, AttributeError, pygame.error) as e:
+            print(f"Could not resize the window to {size[0]}x{size[1]}: {e}")
+
+    def flip(self):
+        """Present the whole frame"""
+        if self.present_mode == BLIT:
+            if self.factor > 1:
+                pygame.transform.scale(self.surface, self.area.size, self.scaled)
+            else:
+                self.scaled.blit(self.surface, (0, 0))
+        pygame.display.flip()
+
+    def update(self, rects: Iterable[pygame.Rect]):
+        """Present only these areas of the frame, given in drawing coordinates"""
+        if self.present_mode != BLIT:
+            pygame.display.update(list(rects))
+            return
+        factor = self.factor
+        bounds = self.surface.get_rect()
+        updated = []
+        for rect in rects:
+            rect = pygame.Rect(rect).clip(bounds)
+            if not rect.width or not rect.height:
+                continue
+            target = pygame.Rect(rect.x * factor, rect.y * factor,
+                                 rect.width * factor, rect.height * factor)
+            if factor > 1:
+                pygame.transform.scale(self.surface.subsurface(rect), target.size,
+                                       self.scaled.subsurface(target))
+            else:
+                target = self.scaled.blit(self.surface, rect, rect)
+            updated.append(target.move(self.area.topleft))
+        pygame.display.update(updated)
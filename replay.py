@@ -0,0 +1,213 @@
+import argparse
+import struct
+import time
+import zlib
+from typing import List, Optional, Tuple
+from constants import FIXED_TIMESTEP, COLLISION_MODE, SWARM_PROFILE
+from input_state import FrameInput, apply_input
+from profiler import FrameProfiler, profile_session
+from simulation import Simulation, print_pool_stats
+
+# File layout: an uncompressed header followed by a zlib stream of frame records.
+# The frame count and final score in the header are filled in when recording stops.
+MAGIC = b"SIRP"
+VERSION = 2
+# magic, version, seed, timestep, frames, final score, swarm profile name
+HEADER = struct.Struct("<4sHQdIq16s")
+FRAME = struct.Struct("<dBdB")         # delta time, input flags, gyro velocity, button presses
+# Frames between sync flushes, so a crash loses at most this many frames
+SYNC_INTERVAL = 600
+
+# Input flag bits
+LEFT = 1
+RIGHT = 2
+FIRE = 4
+USE_BUTTON = 8
+HAS_GYRO = 16
+
+
+def pack_frame(dt: float, frame_input: FrameInput) -> bytes:
+    flags = ((LEFT if frame_input.left else 0)
+             | (RIGHT if frame_input.right else 0)
+             | (FIRE if frame_input.fire else 0)
+             | (USE_BUTTON if frame_input.use_button else 0)
+             | (HAS_GYRO if frame_input.gyro_velocity is not None else 0))
+    gyro = frame_input.gyro_velocity if frame_input.gyro_velocity is not None else 0.0
+    return FRAME.pack(dt, flags, gyro, min(frame_input.button_presses, 255))
+
+
+def unpack_frame(data: bytes, offset: int = 0) -> Tuple[float, FrameInput]:
+    dt, flags, gyro, presses = FRAME.unpack_from(data, offset)
+    return dt, FrameInput(
+        left=bool(flags & LEFT),
+        right=bool(flags & RIGHT),
+        fire=bool(flags & FIRE),
+        gyro_velocity=gyro if flags & HAS_GYRO else None,
+        use_button=bool(flags & USE_BUTTON),
+        button_presses=presses
+    )
+
+
+class Recorder:
+    """
+    Writes one game's seed, per-frame delta time and input to a compact binary file.
+    Frames are buffered through a zlib compressor, so recording costs a struct pack
+    per frame and the file stays small however long the game runs.
+    """
+
+    def __init__(self, path: str, seed: int, swarm_profile: str = SWARM_PROFILE,
+                 timestep: float = FIXED_TIMESTEP):
+        """
+        Start recording.
+
+        Args:
+            path: Output file
+            seed: Seed the simulation was reset with for this game
+            swarm_profile: Alien steering profile the game runs with
+            timestep: Fixed simulation timestep in use
+        """
+        self.path = path
+        self.seed = seed
+        self.swarm_profile = swarm_profile
+        self.timestep = timestep
+        self.frames = 0
+        self._file = open(path, "wb")
+        self._write_header(-1)
+        self._compressor = zlib.compressobj(9)
+
+    def record(self, dt: float, frame_input: FrameInput):
+        """Append the real frame time and the input applied before it"""
+        self._file.write(self._compressor.compress(pack_frame(dt, frame_input)))
+        self.frames += 1
+        if self.frames % SYNC_INTERVAL == 0:
+            self._file.write(self._compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    def _write_header(self, score: int):
+        self._file.write(HEADER.pack(MAGIC, VERSION, self.seed, self.timestep, self.frames,
+                                     score, self.swarm_profile.encode("ascii")))
+
+    def close(self, score: int = -1):
+        """Finish the file, storing the final score so a replay can be checked against it"""
+        if self._file.closed:
+            return
+        self._file.write(self._compressor.flush())
+        self._file.seek(0)
+        self._write_header(score)
+        self._file.close()
+        print(f"Recorded {self.frames} frames to {self.path}")
+
+
+class Recording:
+    """A recording loaded back into memory"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            data = f.read()
+        if len(data) < HEADER.size or data[:4] != MAGIC or \
+                struct.unpack_from("<H", data, 4)[0] != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} recording")
+        _, _, self.seed, self.timestep, self.frame_count, self.score, swarm_profile = \
+            HEADER.unpack_from(data)
+        self.swarm_profile = swarm_profile.rstrip(b"\0").decode("ascii")
+        payload = zlib.decompressobj().decompress(data[HEADER.size:])
+        # A recording cut short by a crash still replays up to its last complete frame
+        complete = len(payload) // FRAME.size
+        self.frames: List[Tuple[float, FrameInput]] = [
+            unpack_frame(payload, i * FRAME.size) for i in range(complete)]
+
+
+def replay(recording: Recording, collision_mode: str = COLLISION_MODE,
+           profiler: Optional[FrameProfiler] = None) -> Simulation:
+    """
+    Re-run a recorded game as fast as possible, without a display.
+    Frame times are fed through the same fixed-timestep accumulator as Game.update.
+
+    Args:
+        recording: The loaded recording
+        collision_mode: Collision mode to replay with
+        profiler: Receives one row per recorded frame when given
+
+    Returns:
+        Simulation: The simulation in its final state
+    """
+    sim = Simulation(seed=recording.seed, collision_mode=collision_mode,
+                     swarm_profile=recording.swarm_profile)
+    sim.profiler = profiler
+    accumulator = 0.0
+    collision_tests = 0
+    for dt, frame_input in recording.frames:
+        if profiler:
+            profiler.begin_frame()
+        apply_input(sim, frame_input)
+        if profiler:
+            profiler.lap("input")
+
+        accumulator += dt
+        steps = 0
+        while accumulator >= recording.timestep and not sim.game_over:
+            sim.step(recording.timestep)
+            accumulator -= recording.timestep
+            steps += 1
+        sim.events.clear()
+
+        if profiler:
+            profiler.lap("events")
+            profiler.end_frame(
+                aliens=len(sim.aliens),
+                bullets=len(sim.bullets),
+                projectiles=len(sim.alien_projectiles),
+                collision_tests=sim.collision_tests - collision_tests,
+                steps=steps
+            )
+            collision_tests = sim.collision_tests
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded game headlessly")
+    parser.add_argument("recording", help="file written by main.py --record")
+    parser.add_argument("--collision-mode", default=COLLISION_MODE,
+                        choices=["hash", "brute", "verify"])
+    parser.add_argument("--frames-out", metavar="FILE", default=None,
+                        help="write per-frame timings to a .csv or .json file")
+    parser.add_argument("--slowest", type=int, default=5, help="number of slowest frames to list")
+    parser.add_argument("--cprofile", metavar="FILE", default=None,
+                        help="run the replay under cProfile and write the stats to FILE")
+    args = parser.parse_args()
+
+    recording = Recording(args.recording)
+    profiler = FrameProfiler(capacity=max(1, len(recording.frames)))
+    result = {}
+
+    def run():
+        started = time.perf_counter()
+        result["sim"] = replay(recording, args.collision_mode, profiler)
+        result["elapsed"] = time.perf_counter() - started
+
+    if args.cprofile:
+        profile_session(run, args.cprofile)
+    else:
+        run()
+
+    sim = result["sim"]
+    frames = len(recording.frames)
+    print(f"Replayed {frames} frames (seed {recording.seed}, {recording.swarm_profile} swarm) "
+          f"in {result['elapsed']:.3f}s ({frames / max(result['elapsed'], 1e-9):.0f} frames/s)")
+    if recording.score >= 0:
+        status = "matches" if sim.score == recording.score else "DOES NOT match"
+        print(f"Final score {sim.score} {status} the recorded score {recording.score}")
+    else:
+        print(f"Final score {sim.score}")
+    print_pool_stats(sim)
+
+    rows = profiler.recorded()
+    slowest = rows[rows["total_ms"].argsort()[::-1][:args.slowest]]
+    for row in slowest:
+        print(f"  frame {row['frame']}: {row['total_ms']:.3f} ms, {row['aliens']} aliens, "
+              f"{row['bullets']} bullets, {row['collision_tests']} collision tests")
+    if args.frames_out:
+        profiler.export(args.frames_out)
+
+
+if __name__ == "__main__":
+    main()
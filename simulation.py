@@ -0,0 +1,398 @@
+import argparse
+import math
+import random
+import struct
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from constants import (
+    Entity, BULLET_SPEED, SHOOT_COOLDOWN,
+    WINDOW_WIDTH, WINDOW_HEIGHT, ALIEN_SPEED, SHOOT_CHANCE, COLLISION_RADIUS,
+    ALIEN_PROJECTILE_SPEED, FIXED_TIMESTEP, MAX_BULLETS, MAX_ALIEN_PROJECTILES,
+    BRUTE_FORCE, VERIFY, COLLISION_MODE, BRUTE_FORCE_MAX_TESTS, SWARM_PROFILE,
+    PLAYER_ALIEN_SCALE, BULLET_SCALE, ALIEN_PROJECTILE_SCALE
+)
+from entity_store import EntityStore
+from spatial_hash import SpatialHash, brute_force_pairs, resolve_hits
+from swarm_ai import SwarmAI, PROFILES
+
+# Events reported by Simulation.step, as (kind, x, y) tuples
+SHOOT = "shoot"
+EXPLOSION = "explosion"
+PLAYER_DIED = "player_died"
+
+# Source sprite for each entity kind and the scale it is drawn at
+SPRITES = {
+    "player": ("assets/player.png", PLAYER_ALIEN_SCALE),
+    "alien": ("assets/alien.png", PLAYER_ALIEN_SCALE),
+    "bullet": ("assets/bullet.png", BULLET_SCALE),
+    "alien_projectile": ("assets/alien_projectile.png", ALIEN_PROJECTILE_SCALE),
+}
+
+
+@dataclass
+class SimParams:
+    """Gameplay tuning values, defaulting to the ones in constants.py"""
+    alien_speed: float = ALIEN_SPEED
+    shoot_chance: float = SHOOT_CHANCE              # Chance per step that each alien fires
+    alien_projectile_speed: float = ALIEN_PROJECTILE_SPEED
+    collision_radius: float = COLLISION_RADIUS
+
+    def max_substep(self) -> float:
+        """Longest single step before a bullet closing on an alien could jump past it"""
+        return self.collision_radius / (BULLET_SPEED + self.alien_speed)
+
+
+def png_size(path: str) -> Tuple[int, int]:
+    """Read the pixel size of a PNG from its header, without decoding it"""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    width, height = struct.unpack(">II", header[16:24])
+    return width, height
+
+
+def load_sprite_sizes() -> Dict[str, Tuple[int, int]]:
+    """
+    Work out the on-screen size of every sprite without needing a display.
+
+    Returns:
+        dict: Entity kind -> (width, height) after scaling
+    """
+    sizes = {}
+    for kind, (path, scale) in SPRITES.items():
+        width, height = png_size(path)
+        sizes[kind] = (int(width * scale), int(height * scale))
+    return sizes
+
+
+class Simulation:
+    """
+    Display-free game logic advanced with a fixed timestep.
+
+    Holds the player, aliens, bullets and projectiles and nothing that needs a
+    window, a mixer or input hardware. Anything the front end should react to
+    (sounds, effects, the player dying) is reported through ``events``.
+    """
+
+    def __init__(self, seed: Optional[int] = None,
+                 sprite_sizes: Optional[Dict[str, Tuple[int, int]]] = None,
+                 collision_mode: str = COLLISION_MODE, swarm_profile: str = SWARM_PROFILE,
+                 params: Optional[SimParams] = None):
+        """
+        Initialize the simulation and start a new game.
+
+        Args:
+            seed: Seed for all game randomness. A random seed is chosen if None.
+            sprite_sizes: Entity kind -> (width, height); read from the assets if None
+            collision_mode: SPATIAL_HASH, BRUTE_FORCE or VERIFY
+            swarm_profile: Alien steering profile, a key of swarm_ai.PROFILES
+            params: Gameplay tuning; the values in constants.py if None
+        """
+        self.sprite_sizes = sprite_sizes or load_sprite_sizes()
+        self.params = params or SimParams()
+        self.max_substep = self.params.max_substep()
+
+        # Collision broadphase
+        self.collision_mode = collision_mode
+        self.alien_grid = SpatialHash(self.params.collision_radius)
+        self.projectile_grid = SpatialHash(self.params.collision_radius)
+        # Grids whose store has changed; each is rebuilt when a query first needs it
+        self.stale_grids = set()
+        self.collision_checks = 0
+        self.collision_mismatches = 0
+        # Running count of narrow-phase distance tests
+        self.collision_tests = 0
+        # Running count of pair queries answered by each path
+        self.hash_queries = 0
+        self.brute_force_queries = 0
+        # Optional profiler.FrameProfiler, lapped at the end of each step phase
+        self.profiler = None
+
+        self.swarm = SwarmAI(swarm_profile, speed=self.params.alien_speed)
+
+        # Entity storage is allocated once and reused by every game
+        self.aliens = EntityStore()
+        self.bullets = EntityStore(max_capacity=MAX_BULLETS)
+        self.alien_projectiles = EntityStore(max_capacity=MAX_ALIEN_PROJECTILES)
+
+        self.events: List[Tuple[str, float, float]] = []
+        self.seed(seed)
+        self.reset()
+
+    def seed(self, seed: Optional[int] = None):
+        """Reseed the game randomness. The same seed and inputs replay the same game."""
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed_value = seed
+        self.rng = np.random.default_rng(seed)
+
+    def reset(self):
+        """Start a new game with a fresh wave"""
+        player_width, player_height = self.sprite_sizes["player"]
+        # Initialize player at the bottom center of the screen
+        self.player = Entity(
+            WINDOW_WIDTH // 2,
+            WINDOW_HEIGHT - player_height,
+            player_width,
+            player_height
+        )
+        self.player_prev_x = self.player.x
+        self.bullets.clear()
+        self.alien_projectiles.clear()
+        self.shoot_timer = 0
+        self.score = 0
+        self.game_over = False
+        self.frame = 0
+        self.time = 0.0
+        # Waves spawned so far this game, the current one included
+        self.wave = 0
+        self.events.clear()
+        self.spawn_aliens()
+
+    def spawn_aliens(self):
+        self.aliens.clear()
+        self.wave += 1
+
+        base_count = 10
+        extra_aliens = int(self.rng.integers(1, 6))
+        total_aliens = base_count + extra_aliens
+
+        alien_width, alien_height = self.sprite_sizes["alien"]
+        self.aliens.spawn_many(
+            self.rng.uniform(WINDOW_WIDTH * 0.1, WINDOW_WIDTH * 0.9, total_aliens),
+            self.rng.uniform(WINDOW_HEIGHT * 0.1, WINDOW_HEIGHT * 0.4, total_aliens),
+            alien_width,
+            alien_height,
+            self.rng.uniform(-30, 30, total_aliens),
+            self.rng.uniform(-20, 20, total_aliens)
+        )
+
+    def shoot(self):
+        """Fire a bullet from the player and restart the shot cooldown"""
+        self.shoot_timer = SHOOT_COOLDOWN
+        bullet_width, bullet_height = self.sprite_sizes["bullet"]
+        x = self.player.x + self.player.width // 2 - bullet_width // 2
+        fired = self.bullets.spawn(
+            x,
+            self.player.y,
+            bullet_width,
+            bullet_height,
+            0,
+            -BULLET_SPEED
+        )
+        if fired >= 0:
+            self.events.append((SHOOT, x, self.player.y))
+
+    def _player_died(self):
+        if not self.game_over:
+            self.game_over = True
+            self.events.append((PLAYER_DIED, self.player.x, self.player.y))
+
+    def step(self, dt: float = FIXED_TIMESTEP):
+        """
+        Advance the game by dt seconds.
+        Steps longer than max_substep are split up, so no bullet can pass
+        through an alien between two collision checks.
+
+        Args:
+            dt: Timestep in seconds, normally FIXED_TIMESTEP
+        """
+        if dt > self.max_substep:
+            substeps = math.ceil(dt / self.max_substep)
+            for _ in range(substeps):
+                self._advance(dt / substeps)
+        else:
+            self._advance(dt)
+
+    def _advance(self, dt: float):
+        self.frame += 1
+        self.time += dt
+
+        # Update timers
+        self.shoot_timer -= dt
+
+        # Update player position
+        self.player_prev_x = self.player.x
+        self.player.x += self.player.velocity_x * dt
+        self.player.x = max(0, min(WINDOW_WIDTH - self.player.width, self.player.x))
+
+        # Update bullets
+        self.bullets.integrate(dt)
+        self.bullets.compact(self.bullets.y >= 0)
+
+        # Update alien projectiles
+        self.alien_projectiles.integrate(dt)
+        if self.profiler:
+            self.profiler.lap("movement")
+        self.index_entities(self.projectile_grid)
+        if self.player_hit_by(self.projectile_grid, self.alien_projectiles):
+            self._player_died()
+        self.alien_projectiles.compact(self.alien_projectiles.y <= WINDOW_HEIGHT)
+        if self.profiler:
+            self.profiler.lap("collisions")
+
+        # Update aliens
+        player_center_x = self.player.x + self.player.width // 2
+        player_center_y = self.player.y + self.player.height // 2
+        self.swarm.steer(self.aliens, player_center_x, player_center_y)
+        self.aliens.integrate(dt)
+        self.aliens.remove(self.aliens.outside(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
+
+        shooters = np.flatnonzero(self.rng.random(len(self.aliens)) < self.params.shoot_chance)
+        if len(shooters):
+            projectile_width, projectile_height = self.sprite_sizes["alien_projectile"]
+            self.alien_projectiles.spawn_many(
+                self.aliens.x[shooters] + self.aliens.width[shooters] // 2 - projectile_width // 2,
+                self.aliens.y[shooters] + self.aliens.height[shooters],
+                projectile_width,
+                projectile_height,
+                0,
+                self.params.alien_projectile_speed
+            )
+        if self.profiler:
+            self.profiler.lap("aliens")
+
+        self.index_entities(self.alien_grid)
+        if self.player_hit_by(self.alien_grid, self.aliens):
+            self._player_died()
+
+        # Check bullet collisions with aliens
+        hit_bullets, hit_aliens = self.find_pairs(
+            self.bullets.center_x(), self.bullets.center_y(),
+            self.alien_grid, self.aliens)
+        if len(hit_bullets):
+            dead_bullets, dead_aliens = resolve_hits(
+                hit_bullets, hit_aliens, len(self.bullets), len(self.aliens))
+            for x, y in zip(self.aliens.center_x()[dead_aliens].tolist(),
+                            self.aliens.center_y()[dead_aliens].tolist()):
+                self.score += 1
+                self.events.append((EXPLOSION, x, y))
+            self.bullets.remove(dead_bullets)
+            self.aliens.remove(dead_aliens)
+
+        if not self.aliens:
+            self.spawn_aliens()
+        if self.profiler:
+            self.profiler.lap("collisions")
+
+    def index_entities(self, grid: SpatialHash):
+        """Mark a broadphase grid for rebuilding over its store's current entity centers"""
+        if self.collision_mode != BRUTE_FORCE:
+            self.stale_grids.add(grid)
+
+    def player_hit_by(self, grid: SpatialHash, store: EntityStore) -> bool:
+        """Check whether any entity in store touches the player"""
+        hits, _ = self.find_pairs(
+            np.array([self.player.x + self.player.width // 2], dtype=np.float64),
+            np.array([self.player.y + self.player.height // 2], dtype=np.float64),
+            grid, store)
+        return len(hits) > 0
+
+    def find_pairs(self, query_x: np.ndarray, query_y: np.ndarray,
+                   grid: SpatialHash, store: EntityStore) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find every (query point, entity) pair within the collision radius.
+
+        Args:
+            query_x, query_y: Centers of the entities being tested
+            grid: Broadphase grid indexed over store
+            store: Entities the grid was built from
+
+        Returns:
+            Tuple of index arrays (query indices, store indices), sorted by query then store index
+        """
+        tests = len(query_x) * len(store)
+        if self.collision_mode == BRUTE_FORCE or \
+                (self.collision_mode != VERIFY and tests <= BRUTE_FORCE_MAX_TESTS):
+            self.collision_tests += tests
+            self.brute_force_queries += 1
+            return brute_force_pairs(query_x, query_y, store.center_x(), store.center_y(),
+                                     self.params.collision_radius)
+
+        if grid in self.stale_grids:
+            self.stale_grids.discard(grid)
+            grid.build(store.center_x(), store.center_y())
+        pairs = grid.query_pairs(query_x, query_y, self.params.collision_radius)
+        self.collision_tests += grid.tests
+        self.hash_queries += 1
+        if self.collision_mode == VERIFY:
+            expected = brute_force_pairs(query_x, query_y, store.center_x(), store.center_y(),
+                                         self.params.collision_radius)
+            self.collision_checks += 1
+            if not (np.array_equal(pairs[0], expected[0]) and
+                    np.array_equal(pairs[1], expected[1])):
+                self.collision_mismatches += 1
+                print(f"Collision mismatch: spatial hash {list(zip(*pairs))} "
+                      f"!= brute force {list(zip(*expected))}")
+        return pairs
+
+    def pool_stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Returns:
+            dict: High-water mark, cap and dropped spawns for each entity pool
+        """
+        return {
+            name: {"high_water": store.high_water, "capacity": store.capacity,
+                   "dropped": store.dropped}
+            for name, store in (("aliens", self.aliens), ("bullets", self.bullets),
+                                ("alien_projectiles", self.alien_projectiles))
+        }
+
+    def run(self, frames: int, dt: float = FIXED_TIMESTEP,
+            policy: Optional[Callable[["Simulation"], None]] = None,
+            restart: bool = False) -> int:
+        """
+        Step the simulation as fast as possible.
+
+        Args:
+            frames: Maximum number of steps to run
+            dt: Timestep in seconds
+            policy: Called before every step to set player input
+            restart: Start a new game when the player dies instead of stopping
+
+        Returns:
+            int: Number of steps actually run
+        """
+        for i in range(frames):
+            if self.game_over:
+                if not restart:
+                    return i
+                self.reset()
+            if policy is not None:
+                policy(self)
+            self.step(dt)
+            self.events.clear()
+        return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the game logic headlessly")
+    parser.add_argument("--frames", type=int, default=10000, help="number of steps to simulate")
+    parser.add_argument("--seed", type=int, default=None, help="seed for all game randomness")
+    parser.add_argument("--collision-mode", default=COLLISION_MODE,
+                        choices=["hash", "brute", "verify"])
+    parser.add_argument("--swarm", default=SWARM_PROFILE, choices=sorted(PROFILES),
+                        help="alien steering profile")
+    args = parser.parse_args()
+
+    sim = Simulation(seed=args.seed, collision_mode=args.collision_mode,
+                     swarm_profile=args.swarm)
+    start = time.perf_counter()
+    frames = sim.run(args.frames, restart=True)
+    elapsed = time.perf_counter() - start
+    print(f"Seed {sim.seed_value}: {frames} frames in {elapsed:.3f}s "
+          f"({frames / elapsed:.0f} frames/s), score {sim.score}")
+    if sim.collision_mode == VERIFY:
+        print(f"Collision checks: {sim.collision_checks}, mismatches: {sim.collision_mismatches}")
+    print_pool_stats(sim)
+
+
+def print_pool_stats(sim: Simulation):
+    for name, stats in sim.pool_stats().items():
+        print(f"  {name}: high water {stats['high_water']} of {stats['capacity']}, "
+              f"{stats['dropped']} dropped")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,48 +1,202 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, List
 import pygame
 
+# Mixer settings. A 512-sample buffer keeps latency around 12 ms at 44.1 kHz;
+# the pygame default of 4096 makes shots audibly lag behind the screen.
+MIXER_FREQUENCY = 44100
+MIXER_SIZE = -16
+MIXER_CHANNELS = 2
+MIXER_BUFFER = 512
+
+
+@dataclass
+class Effect:
+    """How one sound effect is played"""
+    path: str
+    volume: float
+    voices: int         # Channels reserved for this effect, which caps how many play at once
+    priority: int       # A full effect may take a voice from a lower-priority one
+    steal: bool = True  # When no voice can be borrowed, cut off this effect's oldest voice
+
+
+EFFECTS = {
+    "shoot": Effect("assets/shoot.wav", 0.3, voices=3, priority=0),
+    "explosion": Effect("assets/explosion.wav", 0.4, voices=4, priority=1),
+    "game_over": Effect("assets/game_over.wav", 0.5, voices=1, priority=2),
+}
+
+
+def configure_mixer():
+    """Request a low-latency mixer. Must run before pygame.init() to take effect."""
+    pygame.mixer.pre_init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+
+
 class SoundController:
+    """
+    Plays sound effects on reserved mixer channels.
+
+    play_* calls only queue a request; flush() runs once per frame and starts
+    the queued sounds. Each effect owns a fixed group of channels, so a burst
+    of explosions can never use up the channels other effects need. When an
+    effect's group is busy it borrows the oldest voice of a lower-priority
+    effect, or else replaces its own oldest voice, or drops the request. A
+    voice is only ever taken from a sound of equal or lower priority, even
+    when it sits in a lower-priority group's channel.
+    """
+
     def __init__(self):
         """Initialize the sound controller and load sound effects"""
         # Ensure pygame mixer is initialized
         if not pygame.mixer.get_init():
-            pygame.mixer.init()
-            
+            pygame.mixer.init(MIXER_FREQUENCY, MIXER_SIZE, MIXER_CHANNELS, MIXER_BUFFER)
+
+        # Reserve every channel, so nothing else can claim one out from under an effect
+        total = sum(effect.voices for effect in EFFECTS.values())
+        pygame.mixer.set_num_channels(total)
+        pygame.mixer.set_reserved(total)
+        self.channels: Dict[str, List[pygame.mixer.Channel]] = {}
+        next_channel = 0
+        for name, effect in EFFECTS.items():
+            self.channels[name] = [pygame.mixer.Channel(next_channel + i)
+                                   for i in range(effect.voices)]
+            next_channel += effect.voices
+        # When each channel last started a sound, to find the oldest voice
+        self.started: Dict[pygame.mixer.Channel, float] = {}
+        # The effect each channel last started, which a borrowed channel doesn't share
+        # with the group it belongs to
+        self.playing: Dict[pygame.mixer.Channel, str] = {}
+        # Highest priority first, so important sounds get first pick of borrowed voices
+        self.order = sorted(EFFECTS, key=lambda name: -EFFECTS[name].priority)
+
+        self.pending: Dict[str, int] = dict.fromkeys(EFFECTS, 0)
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+
         # Load sound effects
         try:
-            self.shoot_sound = pygame.mixer.Sound("assets/shoot.wav")
-            self.explosion_sound = pygame.mixer.Sound("assets/explosion.wav")
-            self.game_over_sound = pygame.mixer.Sound("assets/game_over.wav")
-            
-            # Set volume levels
-            self.shoot_sound.set_volume(0.3)
-            self.explosion_sound.set_volume(0.4)
-            self.game_over_sound.set_volume(0.5)
-            
+            self.sounds = {}
+            for name, effect in EFFECTS.items():
+                sound = pygame.mixer.Sound(effect.path)
+                sound.set_volume(effect.volume)
+                self.sounds[name] = sound
+
             self.sound_enabled = True
             print("Sound effects loaded successfully!")
-            
+
         except Exception as e:
             print(f"Failed to load sound effects: {e}")
             self.sound_enabled = False
-            
+
     def play_shoot(self):
-        """Play shooting sound effect"""
-        if self.sound_enabled:
-            self.shoot_sound.play()
-            
+        """Queue the shooting sound effect"""
+        self.pending["shoot"] += 1
+
     def play_explosion(self):
-        """Play explosion sound effect"""
-        if self.sound_enabled:
-            self.explosion_sound.play()
-            
+        """Queue the explosion sound effect"""
+        self.pending["explosion"] += 1
+
     def play_game_over(self):
-        """Play game over sound effect"""
-        if self.sound_enabled:
-            self.game_over_sound.play()
-            
+        """Queue the game over sound effect"""
+        self.pending["game_over"] += 1
+
+    def flush(self):
+        """Start everything queued since the last flush. Call once per frame."""
+        if not self.sound_enabled:
+            for name in self.pending:
+                self.pending[name] = 0
+            return
+        now = time.perf_counter()
+        for name in self.order:
+            requested = self.pending[name]
+            if not requested:
+                continue
+            self.pending[name] = 0
+            # More copies than there are voices would only cut each other off
+            voices = min(requested, len(self.channels[name]))
+            self.dropped += requested - voices
+            for _ in range(voices):
+                channel = self._find_voice(name)
+                if channel is None:
+                    self.dropped += 1
+                    continue
+                channel.play(self.sounds[name])
+                self.started[channel] = now
+                self.playing[channel] = name
+                self.played += 1
+
+    def _find_voice(self, name: str):
+        """Pick a channel for one more voice of an effect, or None to drop it"""
+        own = self.channels[name]
+        for channel in own:
+            if not channel.get_busy():
+                return channel
+
+        effect = EFFECTS[name]
+
+        def takeable(channels):
+            # Idle, or playing a sound that doesn't outrank this one
+            return [channel for channel in channels if not channel.get_busy()
+                    or EFFECTS[self.playing[channel]].priority <= effect.priority]
+
+        def oldest(channels):
+            # An idle channel costs nothing to take; otherwise cut off the sound nearest its end
+            return min(channels, key=lambda channel: (channel.get_busy(),
+                                                      self.started.get(channel, 0.0)))
+
+        lower = takeable([channel for other, channels in self.channels.items()
+                          if EFFECTS[other].priority < effect.priority for channel in channels])
+        if not lower and effect.steal:
+            lower = takeable(own)
+        if not lower:
+            return None
+        channel = oldest(lower)
+        if channel.get_busy():
+            self.stolen += 1
+            channel.stop()
+        return channel
+
     def cleanup(self):
         """Clean up sound resources"""
         try:
             pygame.mixer.quit()
         except:
-            pass
\ No newline at end of file
+            pass
+
+
+class NullSoundController:
+    """Drop-in replacement for SoundController that plays nothing, for headless runs"""
+
+    sound_enabled = False
+    played = stolen = dropped = 0
+
+    def play_shoot(self):
+        pass
+
+    def play_explosion(self):
+        pass
+
+    def play_game_over(self):
+        pass
+
+    def flush(self):
+        pass
+
+    def cleanup(self):
+        pass
+
+
+def create_sound_controller(enabled: bool = True):
+    """
+    Returns:
+        SoundController, or NullSoundController if sound is disabled or no audio device is available
+    """
+    if not enabled:
+        return NullSoundController()
+    try:
+        return SoundController()
+    except pygame.error as e:
+        print(f"Audio unavailable ({e}) - running without sound")
+        return NullSoundController()
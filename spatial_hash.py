@@ -0,0 +1,141 @@
+from typing import Tuple
+import numpy as np
+
+# Offsets of a cell and its eight neighbours
+NEIGHBOUR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+
+class SpatialHash:
+    """
+    Uniform grid broadphase over entity centers.
+
+    The grid is rebuilt from scratch every frame with a single sort of the cell
+    keys, which is cheaper than incremental bookkeeping when almost everything
+    moves each frame. With a cell size equal to the collision radius, any pair
+    closer than the radius is guaranteed to sit in the same or a neighbouring
+    cell, so only those candidates get the narrow-phase distance test.
+    """
+
+    def __init__(self, cell_size: float):
+        """
+        Initialize an empty grid.
+
+        Args:
+            cell_size: Width and height of a grid cell, normally the collision radius
+        """
+        self.cell_size = float(cell_size)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.sorted_keys = np.zeros(0, dtype=np.int64)
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        # Number of narrow-phase tests done by the last query
+        self.tests = 0
+
+    def _cells(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return (np.floor(x / self.cell_size).astype(np.int64),
+                np.floor(y / self.cell_size).astype(np.int64))
+
+    @staticmethod
+    def _key(cell_x: np.ndarray, cell_y: np.ndarray) -> np.ndarray:
+        return cell_x * (1 << 32) + cell_y
+
+    def build(self, x: np.ndarray, y: np.ndarray):
+        """
+        Insert a set of points, replacing whatever the grid held before.
+
+        Args:
+            x, y: Arrays of point coordinates (entity centers)
+        """
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        keys = self._key(*self._cells(self.x, self.y))
+        self.order = np.argsort(keys, kind="stable")
+        self.sorted_keys = keys[self.order]
+
+    def query_pairs(self, x: np.ndarray, y: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find every (query point, grid point) pair closer than radius.
+
+        Args:
+            x, y: Arrays of query point coordinates
+            radius: Collision distance, at most the cell size
+
+        Returns:
+            Tuple of index arrays (query indices, grid indices), sorted by query
+            index and then grid index, matching brute_force_pairs
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        if len(x) == 0 or len(self.sorted_keys) == 0:
+            self.tests = 0
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        cell_x, cell_y = self._cells(x, y)
+        query_parts = []
+        grid_parts = []
+        for dx, dy in NEIGHBOUR_OFFSETS:
+            keys = self._key(cell_x + dx, cell_y + dy)
+            lo = np.searchsorted(self.sorted_keys, keys, side="left")
+            hi = np.searchsorted(self.sorted_keys, keys, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # Expand each [lo, hi) range into explicit slots without a Python loop
+            run_starts = np.cumsum(counts) - counts
+            slots = np.repeat(lo - run_starts, counts) + np.arange(total)
+            query_parts.append(np.repeat(np.arange(len(x)), counts))
+            grid_parts.append(self.order[slots])
+
+        if not query_parts:
+            self.tests = 0
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        query_idx = np.concatenate(query_parts)
+        grid_idx = np.concatenate(grid_parts)
+        self.tests = len(query_idx)
+
+        dx = x[query_idx] - self.x[grid_idx]
+        dy = y[query_idx] - self.y[grid_idx]
+        hit = np.sqrt(dx * dx + dy * dy) < radius
+        query_idx = query_idx[hit]
+        grid_idx = grid_idx[hit]
+        order = np.lexsort((grid_idx, query_idx))
+        return query_idx[order], grid_idx[order]
+
+
+def brute_force_pairs(query_x: np.ndarray, query_y: np.ndarray,
+                      grid_x: np.ndarray, grid_y: np.ndarray,
+                      radius: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reference all-pairs test with the same distance check as query_pairs' narrow phase.
+
+    Returns:
+        Tuple of index arrays (query indices, grid indices) in row-major order
+    """
+    dx = np.asarray(query_x, dtype=np.float64)[:, None] - np.asarray(grid_x, dtype=np.float64)[None, :]
+    dy = np.asarray(query_y, dtype=np.float64)[:, None] - np.asarray(grid_y, dtype=np.float64)[None, :]
+    query_idx, grid_idx = np.nonzero(np.sqrt(dx * dx + dy * dy) < radius)
+    return query_idx.astype(np.int64), grid_idx.astype(np.int64)
+
+
+def resolve_hits(first_idx: np.ndarray, second_idx: np.ndarray,
+                 first_count: int, second_count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Turn sorted hit pairs into one-to-one kills.
+    Each entity of the first group destroys the first entity of the second group
+    it touches that has not already been destroyed, in index order.
+
+    Returns:
+        Tuple of boolean masks (destroyed in first group, destroyed in second group)
+    """
+    dead_first = np.zeros(first_count, dtype=bool)
+    dead_second = np.zeros(second_count, dtype=bool)
+    for a, b in zip(first_idx.tolist(), second_idx.tolist()):
+        if dead_first[a] or dead_second[b]:
+            continue
+        dead_first[a] = True
+        dead_second[b] = True
+    return dead_first, dead_second
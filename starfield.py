@@ -0,0 +1,129 @@
+from typing import List, Optional, Tuple
+import numpy as np
+import pygame
+from dirty_rects import grid_rects, tile_grid
+
+# Background constants
+NUM_STARS = 200
+STAR_SPEEDS = [50, 100, 150]
+STAR_COLORS = [(100, 100, 100), (150, 150, 150), (255, 255, 255)]
+BACKGROUND = (0, 0, 0)
+# Above this many visible stars, dirty-rect rendering redraws the whole background
+# instead of blitting stars one by one
+DIRTY_STAR_LIMIT = 1000
+
+
+class StarLayer:
+    """One speed/colour band of stars, pre-rendered to a screen-sized tile"""
+
+    def __init__(self, width: int, height: int, speed: float, color: Tuple[int, int, int],
+                 x: np.ndarray, y: np.ndarray, opaque: bool):
+        self.height = height
+        self.speed = speed
+        self.offset = 0.0
+        self.x = x
+        self.y = y
+
+        # A single star, matching pygame.draw.circle with a radius of 1
+        self.star = pygame.Surface((3, 3))
+        self.star.fill(BACKGROUND)
+        pygame.draw.circle(self.star, color, (1, 1), 1)
+        self.star.set_colorkey(BACKGROUND)
+
+        # Stars near the top or bottom edge are drawn on both sides so the tile wraps seamlessly
+        self.surface = pygame.Surface((width, height))
+        self.surface.fill(BACKGROUND)
+        for wrap in (-height, 0, height):
+            self.surface.blits(
+                [(self.star, (sx - 1, sy - 1 + wrap)) for sx, sy in zip(x.tolist(), y.tolist())],
+                doreturn=False)
+        if not opaque:
+            self.surface.set_colorkey(BACKGROUND)
+
+    def update(self, dt: float):
+        self.offset = (self.offset + self.speed * dt) % self.height
+
+    def positions(self) -> np.ndarray:
+        """
+        Current star centers, as an (n, 2) array.
+        Stars touching the top or bottom edge appear twice, once on each side.
+        """
+        y = (self.y + int(self.offset)) % self.height
+        top = y < 1
+        bottom = y >= self.height - 1
+        return np.column_stack((np.concatenate((self.x, self.x[top], self.x[bottom])),
+                                np.concatenate((y, y[top] + self.height, y[bottom] - self.height))))
+
+
+class Starfield:
+    """
+    Parallax background made of scrolling, pre-rendered star layers.
+
+    Each entry of STAR_SPEEDS becomes one layer, rendered once at startup and
+    then scrolled with two blits per frame, so the background costs the same
+    no matter how many stars it holds. The slowest layer is opaque and doubles
+    as the screen clear.
+    """
+
+    def __init__(self, width: int, height: int, num_stars: int = NUM_STARS,
+                 seed: Optional[int] = None, scale: int = 1):
+        """
+        Build the star layers.
+
+        Args:
+            width, height: Size of the area to cover, normally the window
+            num_stars: Total number of stars across all layers
+            seed: Seed for star placement
+            scale: Window pixels per pixel of the surface drawn on; star speeds are divided by it
+        """
+        self.width = width
+        self.height = height
+        self.num_stars = num_stars
+
+        rng = np.random.default_rng(seed)
+        layer_of_star = rng.integers(0, len(STAR_SPEEDS), num_stars)
+        x = rng.integers(0, width + 1, num_stars)
+        y = rng.integers(0, height, num_stars)
+
+        self.layers: List[StarLayer] = []
+        for i, (speed, color) in enumerate(zip(STAR_SPEEDS, STAR_COLORS)):
+            in_layer = layer_of_star == i
+            self.layers.append(StarLayer(width, height, speed / scale, color,
+                                         x[in_layer], y[in_layer], opaque=(i == 0)))
+        # Layers actually drawn, slowest first; lowered by frame pacing on slow machines
+        self.visible_layers = len(self.layers)
+
+    def update(self, dt: float):
+        for layer in self.layers:
+            layer.update(dt)
+
+    def draw(self, surface: pygame.Surface):
+        """Draw the whole background, replacing whatever was on the surface"""
+        for layer in self.layers[:self.visible_layers]:
+            offset = int(layer.offset)
+            surface.blit(layer.surface, (0, offset))
+            surface.blit(layer.surface, (0, offset - self.height))
+
+    def draw_stars(self, surface: pygame.Surface) -> List[pygame.Rect]:
+        """
+        Draw only the stars themselves, for renderers that clear the screen selectively.
+        Past DIRTY_STAR_LIMIT visible stars the whole background is drawn instead.
+
+        Returns:
+            list: Tiles containing stars, or the whole surface
+        """
+        layers = self.layers[:self.visible_layers]
+        if sum(len(layer.x) for layer in layers) > DIRTY_STAR_LIMIT:
+            self.draw(surface)
+            return [surface.get_rect()]
+        corners = []
+        for layer in layers:
+            positions = layer.positions() - 1
+            surface.blits([(layer.star, position) for position in positions.tolist()],
+                          doreturn=False)
+            corners.append(positions)
+        if not corners:
+            return []
+        corners = np.concatenate(corners)
+        stars = np.column_stack((corners, np.full((len(corners), 2), 3)))
+        return grid_rects(tile_grid(stars, *surface.get_size()))
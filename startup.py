@@ -0,0 +1,127 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import pygame
+
+
+def init_display():
+    """
+    Initialize only the pygame modules needed to open a window and draw text.
+    The mixer is brought up later by the sound controller, off the main thread.
+    """
+    pygame.display.init()
+    pygame.font.init()
+
+
+class Startup:
+    """
+    Times each step of startup and runs the independent ones on a thread pool.
+
+    Steps on the main thread are timed with phase(); background steps are
+    started with submit() and collected with wait(), which keeps calling a
+    progress callback so a splash screen can be drawn in the meantime.
+    finish() marks the end of startup; the report is printed once every
+    background step is done, which may be a few frames later.
+    """
+
+    def __init__(self, workers: int = 4):
+        """
+        Initialize the startup pipeline.
+
+        Args:
+            workers: Number of background loader threads
+        """
+        self.started = time.perf_counter()
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="startup")
+        self.timings: Dict[str, float] = {}
+        self.background: List[str] = []
+        self.futures: List[Future] = []
+        # Seconds from construction to finish(), when the first frame starts
+        self.ready: Optional[float] = None
+        self._reported = False
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of main-thread work"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = time.perf_counter() - start
+
+    def submit(self, name: str, func: Callable, *args, **kwargs) -> Future:
+        """Run func on the loader pool, timing it under name"""
+        self.background.append(name)
+
+        def timed():
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.timings[name] = time.perf_counter() - start
+
+        future = self.executor.submit(timed)
+        self.futures.append(future)
+        return future
+
+    def wait(self, futures: List[Future],
+             on_progress: Optional[Callable[[int, int], None]] = None,
+             interval: float = 1 / 30) -> list:
+        """
+        Block until every future is done, reporting progress while waiting.
+
+        Args:
+            futures: Futures returned by submit()
+            on_progress: Called with (finished, total) about every interval seconds
+            interval: Seconds between progress calls
+
+        Returns:
+            list: The results, in the order of futures. A failed step re-raises here.
+        """
+        with self.phase("waiting"):
+            pending = set(futures)
+            while pending:
+                if on_progress:
+                    on_progress(len(futures) - len(pending), len(futures))
+                _, pending = wait(pending, timeout=interval)
+            if on_progress:
+                on_progress(len(futures), len(futures))
+        return [future.result() for future in futures]
+
+    def finish(self):
+        """
+        Call once the last step has been submitted, just before the first frame.
+        Shuts the loader pool down as its jobs complete and reports when they have.
+        """
+        self.ready = time.perf_counter() - self.started
+        self.executor.shutdown(wait=False)
+        for future in self.futures:
+            future.add_done_callback(self._step_done)
+        if not self.futures:
+            self._step_done(None)
+
+    def _step_done(self, _):
+        # Runs on whichever thread finished the step, or here if it already had
+        with self._lock:
+            if self._reported or not all(future.done() for future in self.futures):
+                return
+            self._reported = True
+        self.report()
+
+    def report(self):
+        """Print how long startup took and where the time went"""
+        total = time.perf_counter() - self.started
+        if self.ready is not None and total - self.ready > 0.001:
+            print(f"Started in {self.ready * 1000:.0f} ms, "
+                  f"background steps done at {total * 1000:.0f} ms")
+        else:
+            print(f"Started in {total * 1000:.0f} ms")
+        for name, seconds in list(self.timings.items()):
+            where = "background" if name in self.background else "main thread"
+            print(f"  {name:<24}{seconds * 1000:>8.1f} ms  ({where})")
+        for name in self.background:
+            if name not in self.timings:
+                print(f"  {name:<24}{'still running':>20}")
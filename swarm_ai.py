@@ -0,0 +1,239 @@
+import math
+from dataclasses import dataclass, replace
+from typing import Optional, Tuple
+import numpy as np
+from constants import ALIEN_SPEED, WINDOW_WIDTH, WINDOW_HEIGHT, HOMING, FLOW_FIELD
+from entity_store import EntityStore
+
+
+@dataclass
+class SwarmProfile:
+    """How a swarm steers towards the player"""
+    speed: float = ALIEN_SPEED
+    flow_field: bool = False            # Follow a coarse per-cell field instead of exact homing
+    flow_cell_size: float = 40.0        # Flow field resolution in pixels
+    separation_radius: float = 0.0      # Aliens closer than this push apart; 0 disables it
+    separation_weight: float = 1.0      # Strength of the push relative to the steering
+
+
+PROFILES = {
+    # Every alien heads straight for the player, as the game always has
+    HOMING: SwarmProfile(),
+    # For big swarms: shared per-cell directions, with aliens spreading out instead of stacking
+    FLOW_FIELD: SwarmProfile(flow_field=True, separation_radius=28.0, separation_weight=1.5),
+}
+
+
+class FlowField:
+    """
+    Coarse grid of unit directions from each cell towards a target.
+
+    The field is only recomputed when the target moves into a different cell,
+    so steering a swarm costs one array lookup per alien on most frames.
+    """
+
+    def __init__(self, width: int, height: int, cell_size: float):
+        """
+        Initialize the field.
+
+        Args:
+            width, height: Area covered, normally the window
+            cell_size: Width and height of a cell in pixels
+        """
+        self.cell_size = float(cell_size)
+        self.cols = math.ceil(width / cell_size)
+        self.rows = math.ceil(height / cell_size)
+        centers_x = (np.arange(self.cols) + 0.5) * self.cell_size
+        centers_y = (np.arange(self.rows) + 0.5) * self.cell_size
+        self.center_x, self.center_y = np.meshgrid(centers_x, centers_y)
+        self.direction_x = np.zeros((self.rows, self.cols))
+        self.direction_y = np.zeros((self.rows, self.cols))
+        # Distance from each cell center to the target cell center
+        self.distance = np.zeros((self.rows, self.cols))
+        self.target_cell = None
+        # Number of times the field was recomputed
+        self.refreshes = 0
+
+    def _cells(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        col = np.clip(np.floor_divide(x, self.cell_size).astype(np.int64), 0, self.cols - 1)
+        row = np.clip(np.floor_divide(y, self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return col, row
+
+    def update(self, target_x: float, target_y: float) -> bool:
+        """
+        Point the field at a target.
+
+        Returns:
+            bool: True if the field had to be recomputed
+        """
+        col, row = self._cells(np.array([target_x]), np.array([target_y]))
+        cell = (int(col[0]), int(row[0]))
+        if cell == self.target_cell:
+            return False
+        self.target_cell = cell
+        dx = self.center_x[cell[1], cell[0]] - self.center_x
+        dy = self.center_y[cell[1], cell[0]] - self.center_y
+        self.distance = np.hypot(dx, dy)
+        scale = np.divide(1.0, self.distance, out=np.zeros_like(self.distance),
+                          where=self.distance > 0)
+        self.direction_x = dx * scale
+        self.direction_y = dy * scale
+        self.refreshes += 1
+        return True
+
+    def lookup(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple of (direction x, direction y, mask of points in the target cell).
+            Points in the target cell get a zero direction.
+        """
+        col, row = self._cells(x, y)
+        at_target = (col == self.target_cell[0]) & (row == self.target_cell[1])
+        return self.direction_x[row, col], self.direction_y[row, col], at_target
+
+
+class SwarmAI:
+    """
+    Steers every alien at once with whole-array operations.
+
+    The default homing profile matches the game's original steering exactly,
+    so seeds and recordings replay the same. The flow field profile trades
+    that precision for a shared field and grid-based separation, whose cost
+    stays linear in the swarm size however tightly it packs.
+    """
+
+    def __init__(self, profile: str = HOMING, width: int = WINDOW_WIDTH,
+                 height: int = WINDOW_HEIGHT, speed: Optional[float] = None):
+        """
+        Initialize the swarm AI.
+
+        Args:
+            profile: Name of an entry in PROFILES
+            width, height: Playfield size covered by the flow field
+            speed: Alien speed, overriding the profile's
+        """
+        self.profile_name = profile
+        self.profile = PROFILES[profile]
+        if speed is not None:
+            self.profile = replace(self.profile, speed=speed)
+        self.field = (FlowField(width, height, self.profile.flow_cell_size)
+                      if self.profile.flow_field else None)
+        self.neighbours = (NeighbourGrid(width, height, self.profile.separation_radius)
+                           if self.profile.separation_radius > 0 else None)
+
+    def steer(self, aliens: EntityStore, target_x: float, target_y: float):
+        """
+        Set every alien's velocity for this step.
+
+        Args:
+            aliens: The alien store, updated in place
+            target_x, target_y: Point the swarm is chasing, normally the player's center
+        """
+        speed = self.profile.speed
+        if self.field is None and self.neighbours is None:
+            aliens.home_towards(target_x, target_y, speed)
+            return
+        if len(aliens) == 0:
+            return
+
+        center_x = aliens.center_x().astype(np.float64)
+        center_y = aliens.center_y().astype(np.float64)
+        if self.field is not None:
+            self.field.update(target_x, target_y)
+            direction_x, direction_y, at_target = self.field.lookup(center_x, center_y)
+            # Inside the target cell the field has no direction, so home in directly
+            if at_target.any():
+                dx = target_x - center_x[at_target]
+                dy = target_y - center_y[at_target]
+                distance = np.hypot(dx, dy)
+                scale = np.divide(1.0, distance, out=np.zeros_like(distance), where=distance > 0)
+                direction_x[at_target] = dx * scale
+                direction_y[at_target] = dy * scale
+        else:
+            dx = target_x - center_x
+            dy = target_y - center_y
+            distance = np.hypot(dx, dy)
+            scale = np.divide(1.0, distance, out=np.zeros_like(distance), where=distance > 0)
+            direction_x = dx * scale
+            direction_y = dy * scale
+
+        if self.neighbours is not None:
+            push_x, push_y = self.separation(center_x, center_y)
+            direction_x = direction_x + push_x * self.profile.separation_weight
+            direction_y = direction_y + push_y * self.profile.separation_weight
+
+        # Renormalize so every alien still moves at the profile speed
+        length = np.hypot(direction_x, direction_y)
+        moving = length > 0
+        scale = np.divide(speed, length, out=np.zeros_like(length), where=moving)
+        aliens.velocity_x[moving] = direction_x[moving] * scale[moving]
+        aliens.velocity_y[moving] = direction_y[moving] * scale[moving]
+
+    def separation(self, x: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Push each point away from the crowd around it.
+
+        Points are counted into a grid with cells the size of the separation
+        radius, and each point is pushed away from the centroid of the other
+        points in its own and the eight neighbouring cells. That costs a few
+        bincounts and array shifts however dense the swarm gets, where testing
+        neighbour pairs grows with the square of the local density.
+
+        Returns:
+            Tuple of per-point push vectors (x, y)
+        """
+        grid = self.neighbours
+        cells = grid.cells(x, y)
+        count, sum_x, sum_y = grid.neighbourhood_sums(cells, x, y)
+        # Centroid of everyone else nearby
+        others = count - 1
+        crowded = others > 0
+        safe = np.maximum(others, 1)
+        dx = np.where(crowded, x - (sum_x - x) / safe, 0.0)
+        dy = np.where(crowded, y - (sum_y - y) / safe, 0.0)
+        distance = np.hypot(dx, dy)
+        # Falls from 1 at the centroid to 0 at the edge of the neighbourhood; a point
+        # sitting exactly on the centroid can't tell which way to go, so it isn't pushed
+        reach = 1.5 * grid.cell_size
+        strength = np.divide(1.0 - np.minimum(distance, reach) / reach, distance,
+                             out=np.zeros_like(distance), where=distance > 0)
+        return dx * strength, dy * strength
+
+
+class NeighbourGrid:
+    """
+    Dense grid of per-cell point counts and coordinate sums.
+
+    Lets every point see aggregate information about its 3x3 neighbourhood
+    of cells without ever comparing points to one another.
+    """
+
+    def __init__(self, width: int, height: int, cell_size: float):
+        self.cell_size = float(cell_size)
+        self.cols = math.ceil(width / cell_size)
+        self.rows = math.ceil(height / cell_size)
+        # Count, x sum and y sum grids with a border of empty cells
+        self._padded = np.zeros((3, self.rows + 2, self.cols + 2))
+
+    def cells(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Flat cell index of each point, clamped to the grid"""
+        col = np.clip(np.floor_divide(x, self.cell_size).astype(np.int64), 0, self.cols - 1)
+        row = np.clip(np.floor_divide(y, self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return row * self.cols + col
+
+    def neighbourhood_sums(self, cells: np.ndarray, x: np.ndarray,
+                           y: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns:
+            Tuple of (point count, x sum, y sum) over each point's 3x3 cell
+            neighbourhood, the point itself included
+        """
+        size = self.rows * self.cols
+        grids = self._padded
+        grids[0, 1:-1, 1:-1] = np.bincount(cells, minlength=size).reshape(self.rows, self.cols)
+        grids[1, 1:-1, 1:-1] = np.bincount(cells, weights=x, minlength=size).reshape(self.rows, self.cols)
+        grids[2, 1:-1, 1:-1] = np.bincount(cells, weights=y, minlength=size).reshape(self.rows, self.cols)
+        # Separable 3x3 box sum: across the columns, then down the rows
+        across = grids[:, :, :-2] + grids[:, :, 1:-1] + grids[:, :, 2:]
+        box = (across[:, :-2] + across[:, 1:-1] + across[:, 2:]).reshape(3, size)
+        return box[0, cells], box[1, cells], box[2, cells]
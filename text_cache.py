@@ -0,0 +1,77 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import pygame
+
+# Font files by name; None selects pygame's built-in font
+FONTS: Dict[str, Optional[str]] = {
+    "default": None,
+    "pixel": "assets/fonts/Pixel Times Bold.ttf",
+}
+
+
+class TextCache:
+    """
+    Loads each font once and keeps rendered text surfaces for reuse.
+
+    Rendered surfaces are keyed by (font, size, text, color) and evicted in
+    least-recently-used order once max_entries is reached, so text that changes
+    every frame cannot grow the cache without bound.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of rendered surfaces kept at once
+        """
+        self.max_entries = max_entries
+        self._fonts: Dict[Tuple[str, int], pygame.font.Font] = {}
+        self._surfaces: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def font(self, name: str, size: int) -> pygame.font.Font:
+        """Get a font, loading it from disk the first time it is asked for"""
+        key = (name, size)
+        font = self._fonts.get(key)
+        if font is None:
+            try:
+                font = pygame.font.Font(FONTS[name], size)
+            except (OSError, FileNotFoundError) as e:
+                print(f"Failed to load font {name}: {e}")
+                font = pygame.font.Font(None, size)
+            self._fonts[key] = font
+        return font
+
+    def render(self, text: str, size: int, color: Tuple[int, int, int],
+               font: str = "default") -> pygame.Surface:
+        """
+        Get an antialiased rendering of text, rasterizing it only on a cache miss.
+
+        Args:
+            text: String to render
+            size: Font size in points
+            color: RGB text color
+            font: Name of a font in FONTS
+
+        Returns:
+            pygame.Surface: The rendered text. Treat it as read-only, it is shared.
+        """
+        key = (font, size, text, color)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self._surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = self.font(font, size).render(text, True, color)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """Drop every rendered surface. Loaded fonts are kept."""
+        self._surfaces.clear()